@@ -0,0 +1,89 @@
+"""
+Dominance between node combos: a -> b when every member of a has a
+descendant-or-self in b.
+
+Only the nodes used by some combo matter, so their descendant-or-self
+bitsets (from the closure index) are unpacked into a small U x U boolean
+matrix once. hit[g, b] (g reaches some member of b) is a gather over b's
+members, and a row a of the combo relation is the AND of hit over a's
+members, so sources (combos nothing else dominates) fall out block by
+block without ever listing the Q x Q edges.
+"""
+import networkx as nx
+import numpy as np
+
+
+class ComboDominance:
+
+    def __init__(self, reach, combos):
+        """reach is a ReachabilityIndex (reachability.closure(G))."""
+        self.combos = list(combos)
+        used = sorted({g for combo in self.combos for g in combo})
+        local = {g: i for i, g in enumerate(used)}
+        U = len(used)
+        at = [reach.index[g] for g in used]
+        below = np.unpackbits(reach.rows[at].view(np.uint8), axis=1, bitorder="little",
+                              count=len(reach))[:, at].astype(bool)
+        below[np.arange(U), np.arange(U)] = True  # descendant-or-self
+
+        width = max((len(combo) for combo in self.combos), default=0)
+        members = np.full((len(self.combos), width), U)  # U pads short combos
+        for q, combo in enumerate(self.combos):
+            members[q, :len(combo)] = [local[g] for g in combo]
+        self.members = members
+
+        # hit[g, b]: g reaches a member of b; the extra row U (padding) hits everything
+        padded = np.zeros((U + 1, U + 1), dtype=bool)
+        padded[:U, :U] = below
+        hit = padded[:, members].any(axis=2)
+        hit[U] = True
+        self.hit = hit
+
+    def __len__(self):
+        return len(self.combos)
+
+    def dominates(self, rows, cols=None):
+        """(len(rows), len(cols)) bool: combo rows[i] -> combo cols[j], self-pairs excluded."""
+        rows = np.asarray(rows)
+        cols = np.arange(len(self.combos)) if cols is None else np.asarray(cols)
+        out = np.logical_and.reduce(self.hit[:, cols][self.members[rows]], axis=1)
+        out &= rows[:, None] != cols[None, :]
+        return out
+
+    def in_degrees(self, block=512):
+        counts = np.zeros(len(self.combos), dtype=np.int64)
+        for lo in range(0, len(self.combos), block):
+            counts += self.dominates(np.arange(lo, min(lo + block, len(self.combos)))).sum(axis=0)
+        return counts
+
+    def sources(self, block=512):
+        """
+        Combos without incoming edges, in self.combos order. Candidate
+        dominators are tried most promising first (a combo dominates at most
+        as many combos as its weakest member hits), and combos already known
+        to be dominated drop out, so this usually stops long before Q x Q.
+        """
+        if not self.combos:
+            return []
+        strength = self.hit.sum(axis=1)[self.members].min(axis=1)
+        order = np.argsort(-strength, kind="stable")
+        open_ = np.arange(len(self.combos))
+        for lo in range(0, len(order), block):
+            if len(open_) == 0:
+                break
+            dominated = self.dominates(order[lo:lo + block], open_).any(axis=0)
+            open_ = open_[~dominated]
+        return [self.combos[q] for q in open_]
+
+    def edges(self, block=512):
+        """Every (a, b), a before b in the order of a double loop over self.combos."""
+        for lo in range(0, len(self.combos), block):
+            rows = self.dominates(np.arange(lo, min(lo + block, len(self.combos))))
+            for i, j in zip(*np.nonzero(rows)):
+                yield self.combos[lo + i], self.combos[j]
+
+    def graph(self):
+        G_cp = nx.DiGraph()
+        G_cp.add_nodes_from(self.combos)
+        G_cp.add_edges_from(self.edges())
+        return G_cp
@@ -0,0 +1,58 @@
+"""
+Branch-and-bound search for node combos that cover at least T M_c.
+
+Nodes are sorted by coverage, largest first, and combos are grown in that
+order. A combo with r slots left can gain at most the coverage of the next
+r nodes, and since coverages only shrink further down the list, the first
+candidate that fails this bound ends the whole branch. Partial unions are
+kept as packed rows (reach_sets.py), so each extension is one OR plus a
+popcount, done for a block of candidates at a time.
+"""
+import numpy as np
+from dominance import popcount
+
+
+def qualified_combos(reach, nodes, M, T, block=1024):
+    """
+    Every combo of 1..M distinct nodes whose reach rows together cover at
+    least T M_c, as node tuples sorted by node id (the combos
+    itertools.combinations would accept, without trying the rest).
+    """
+    nodes = list(nodes)
+    if not nodes or M < 1:
+        return set()
+    rows = reach.rows[[reach.index[u] for u in nodes]]
+    cov = popcount(rows).sum(axis=1).astype(np.int64)
+    order = np.argsort(-cov, kind="stable")
+    rows, cov, nodes = rows[order], cov[order], [nodes[i] for i in order]
+    n = len(nodes)
+    prefix = np.r_[0, np.cumsum(cov)]  # cov[j:j+r].sum() == prefix[j+r] - prefix[j]
+
+    found = set()
+
+    def grow(start, chosen, union, count, slots):
+        # candidates j >= start that can still lift the combo to T
+        j = np.arange(start, n)
+        best = prefix[np.minimum(j + slots, n)] - prefix[j]
+        end = start + int(np.count_nonzero(count + best >= T))
+        for lo in range(start, end, block):
+            hi = min(lo + block, end)
+            unions = rows[lo:hi] if union is None else rows[lo:hi] | union
+            counts = popcount(unions).sum(axis=1).astype(np.int64)
+            for k in np.flatnonzero(counts >= T):
+                found.add(tuple(sorted(chosen + [nodes[lo + k]])))
+            if slots > 1:
+                for k in range(hi - lo):
+                    grow(lo + k + 1, chosen + [nodes[lo + k]], unions[k], counts[k], slots - 1)
+
+    grow(0, [], None, 0, M)
+    return found
+
+
+def combinations_order(combos, nodes):
+    """
+    combos (node tuples) in the order itertools.combinations(nodes, size)
+    yields them, size by size.
+    """
+    pos = {u: i for i, u in enumerate(nodes)}
+    return sorted(combos, key=lambda combo: (len(combo), sorted(pos[u] for u in combo)))
@@ -0,0 +1,136 @@
+"""
+Dominance order on 0/1 relation matrices, on bit-packed integers.
+
+A matrix becomes one integer (bit k = k-th entry in row-major order), so
+"B dominates A" (A <= B entrywise) is (a & ~b) == 0, and graphG.py /
+hasse/graphG_hasse.py can build the comparability graph G from whole
+blocks of rows at a time instead of a Python loop over every pair, and
+its transitive reduction from the covers (one bit apart) without running
+nx.transitive_reduction on G.
+"""
+import numpy as np
+
+
+def pack_matrices(matrices):
+    """One uint64 per 0/1 matrix (up to 64 entries, e.g. 5x5 -> 25 bits)."""
+    flat = np.asarray(matrices).reshape(len(matrices), -1) != 0
+    if flat.shape[1] > 64:
+        raise ValueError(f"{flat.shape[1]} entries do not fit in 64 bits")
+    weights = np.left_shift(np.uint64(1), np.arange(flat.shape[1], dtype=np.uint64))
+    return np.bitwise_or.reduce(np.where(flat, weights, np.uint64(0)), axis=1)
+
+
+def unpack_matrices(bits, shape):
+    """Inverse of pack_matrices: (len(bits),) + shape int array."""
+    size = int(np.prod(shape))
+    weights = np.left_shift(np.uint64(1), np.arange(size, dtype=np.uint64))
+    return ((bits[:, None] & weights) != 0).astype(int).reshape((len(bits),) + tuple(shape))
+
+
+def popcount(bits):
+    """Number of set bits per uint64."""
+    bits = np.asarray(bits, dtype=np.uint64)
+    if hasattr(np, "bitwise_count"):  # numpy >= 2.0
+        return np.bitwise_count(bits)
+    return np.unpackbits(bits.view(np.uint8).reshape(bits.shape + (8,)), axis=-1).sum(axis=-1)
+
+
+def dominance_edges(bits, block=1024):
+    """
+    Every (u, v), u != v, with matrix v <= matrix u: the edges of G, pointing
+    from the dominating matrix to the dominated one. Returned as an (E, 2)
+    int64 array in (u, v) order, which is the order the pairwise loop added
+    them in, so G's adjacency comes out identical.
+    """
+    bits = np.asarray(bits, dtype=np.uint64)
+    parts = []
+    for start in range(0, len(bits), block):
+        u = bits[start:start + block]
+        below = (bits[None, :] & ~u[:, None]) == 0  # below[r, v]: v <= u_r
+        below[np.arange(len(u)), np.arange(start, start + len(u))] = False
+        rows, cols = np.nonzero(below)
+        parts.append(np.stack([rows + start, cols], axis=1))
+    return np.concatenate(parts) if parts else np.empty((0, 2), dtype=np.int64)
+
+
+def dominance_count(bits, block=1024):
+    """Number of dominance pairs (edges of G) without building them."""
+    bits = np.asarray(bits, dtype=np.uint64)
+    total = 0
+    for start in range(0, len(bits), block):
+        u = bits[start:start + block]
+        total += int(((bits[None, :] & ~u[:, None]) == 0).sum()) - len(u)
+    return total
+
+
+def cover_edges(bits):
+    """
+    (u, v) where v is u with one set bit cleared and is in the family: the
+    covers found by flipping each bit of u and looking the result up in a
+    hash index of the packed matrices. Sorted by (u, v).
+    """
+    bits = np.asarray(bits, dtype=np.uint64).tolist()
+    index = {b: i for i, b in enumerate(bits)}  # duplicates: the last one wins
+    edges = []
+    for u, b in enumerate(bits):
+        x = b
+        while x:
+            low = x & -x
+            x ^= low
+            v = index.get(b ^ low)
+            if v is not None:
+                edges.append((u, v))
+    edges.sort()
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def _closure_size(bits, edges):
+    # pairs reachable over edges, building each node's descendant bitset
+    # from its children's in ascending popcount order
+    n = len(bits)
+    words = (n + 63) // 64
+    reach = np.zeros((n, words), dtype=np.uint64)
+    children = np.split(edges[:, 1], np.searchsorted(edges[:, 0], np.arange(1, n)))
+    one = np.uint64(1)
+    for u in np.argsort(popcount(bits), kind="stable"):
+        for v in children[u]:
+            reach[u] |= reach[v]
+            reach[u, v >> 6] |= one << np.uint64(v & 63)
+    return int(popcount(reach).sum())
+
+
+def reduction_edges(bits):
+    """
+    Transitive reduction of the dominance order for any family: u -> v is
+    kept when v is below u and below no other w that is below u.
+    """
+    bits = np.asarray(bits, dtype=np.uint64)
+    n = len(bits)
+    below = np.zeros((n, n), dtype=bool)
+    for start in range(0, n, 1024):
+        below[start:start + 1024] = (bits[None, :] & ~bits[start:start + 1024, None]) == 0
+    np.fill_diagonal(below, False)
+    packed = np.packbits(below, axis=1)
+    edges = []
+    for u in range(n):
+        lower = np.flatnonzero(below[u])
+        if len(lower) == 0:
+            continue
+        through = np.unpackbits(np.bitwise_or.reduce(packed[lower], axis=0), count=n).astype(bool)
+        edges.extend((u, v) for v in np.flatnonzero(below[u] & ~through))
+    return np.array(edges, dtype=np.int64).reshape(-1, 2)
+
+
+def hasse_edges(bits):
+    """
+    Edges of the transitive reduction of G (dominating -> dominated).
+
+    Covers that differ by one bit are always in the reduction. When their
+    closure already reaches every dominance pair (as for the Hasse diagram
+    families), they are the whole reduction; otherwise some covers skip
+    levels inside the family and reduction_edges() computes it exactly.
+    """
+    edges = cover_edges(bits)
+    if _closure_size(bits, edges) == dominance_count(bits):
+        return edges
+    return reduction_edges(bits)
@@ -3,84 +3,88 @@ import numpy as np
 import json
 import os
 import pandas as pd
-
-def build_graph():
+from dominance import pack_matrices, dominance_edges, hasse_edges
+from graph_cache import cache_file, load_graph, save_graph, graphs_from_arrays
+from matrix_index import MatrixIndex
+from reachability import ReachabilityIndex
+
+def build_graph(write_csv=False, use_cache=True):
+    """
+    G (edges from each matrix to every matrix it dominates) and its
+    transitive reduction. Both are cached under graph_cache/, keyed by the
+    JSON's content, so later runs load them instead of rebuilding;
+    write_csv=True also writes the dense adjacency CSVs.
+    """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     json_file = os.path.join(script_dir, "posets_n5.json")
-
-    with open(json_file, "r") as f:
-        hasse_results = json.load(f)
-
-    if isinstance(hasse_results, dict):
-        all_matrices = []
-        for m in sorted(hasse_results.keys(), key=int):
-            all_matrices.extend(hasse_results[m])
-    elif isinstance(hasse_results, list):
-        all_matrices = hasse_results
+    graph_file = cache_file(json_file)
+
+    cached = load_graph(graph_file) if use_cache else None
+    if cached is not None:
+        G, G_reduced = graphs_from_arrays(*cached)
+        num_matrices = G.number_of_nodes()
+        print(f"Loaded G and its transitive reduction from '{graph_file}'")
+        print("Graph constructed with {} vertices and {} edges.".format(G.number_of_nodes(), G.number_of_edges()))
+        print("Transitive reduction has {} vertices and {} edges.".format(G_reduced.number_of_nodes(), G_reduced.number_of_edges()))
     else:
-        raise TypeError("posets_n5.json")
-
-
-    num_matrices = len(all_matrices)
-    print("Total matrices:", num_matrices)  #219
-
-    # matrix to NumPy arr
-    all_matrices_np = [np.array(mat) for mat in all_matrices]
-
-
-    G = nx.DiGraph()
-    ##G.add_nodes_from(range(num_matrices))   ## we have to attach matrices ot nodes
-    for idx, mat in enumerate(all_matrices_np):
-        G.add_node(idx, matrix=mat)
-
-
-    # For each unordered pair (i, j), check if Matrix(j) - Matrix(i) has no negative entries.
-    for i in range(num_matrices):
-        for j in range(i + 1, num_matrices):
-            
-            diff_ij = all_matrices_np[j] - all_matrices_np[i]
-            if np.all(diff_ij >= 0): #changed
-                #G.add_edge(i, j)
-                G.add_edge(j, i)
-               
-            
-            diff_ji = all_matrices_np[i] - all_matrices_np[j]
-            if np.all(diff_ji >= 0): #changed
-                #G.add_edge(j, i)
-                G.add_edge(i, j)
-                
-
-    print("Graph constructed with {} vertices and {} edges.".format(G.number_of_nodes(), G.number_of_edges()))
-    adj_matrix = nx.to_numpy_array(G, dtype=int)
-    df_adj = pd.DataFrame(adj_matrix, index=range(num_matrices), columns=range(num_matrices))
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file_csv = os.path.join(script_dir, "final_graph_adjacency-posets_n5.csv")
-    df_adj.to_csv(output_file_csv)
-
-    print(f"Saved the adjacency matrix of final graph G to '{output_file_csv}'")
-
-    # to make sure howm any rows and columns we have
-    df_check = pd.read_csv(output_file_csv, index_col=0)
-    num_rows, num_cols = df_check.shape
-    print(f"\n")
-    print(f"graph G has {num_rows} rows and {num_cols} columns.")
-
-
-
-    # transitive reduction of the graph
-    G_reduced = nx.transitive_reduction(G)
-    # Preserve 'matrix' attributes from G to G_reduced
-    for node in G_reduced.nodes():
-        G_reduced.nodes[node]['matrix'] = G.nodes[node]['matrix']
-    print("Transitive reduction has {} vertices and {} edges.".format(G_reduced.number_of_nodes(), G_reduced.number_of_edges()))
-
-    adj_matrix_reduced = nx.to_numpy_array(G_reduced, dtype=int)
-    df_adj_reduced = pd.DataFrame(adj_matrix_reduced, index=range(num_matrices), columns=range(num_matrices))
-
-    output_file_reduced_csv = os.path.join(script_dir, "final_graph_adjacency-posets_n5_transitive_reduction.csv")
-    df_adj_reduced.to_csv(output_file_reduced_csv)
-    print(f"Saved the transitive reduction adjacency matrix to '{output_file_reduced_csv}'")
+        with open(json_file, "r") as f:
+            hasse_results = json.load(f)
+
+        if isinstance(hasse_results, dict):
+            all_matrices = []
+            for m in sorted(hasse_results.keys(), key=int):
+                all_matrices.extend(hasse_results[m])
+        elif isinstance(hasse_results, list):
+            all_matrices = hasse_results
+        else:
+            raise TypeError("posets_n5.json")
+
+
+        num_matrices = len(all_matrices)
+        print("Total matrices:", num_matrices)  #219
+
+        # matrix to NumPy arr
+        all_matrices_np = [np.array(mat) for mat in all_matrices]
+
+
+        G = nx.DiGraph()
+        ##G.add_nodes_from(range(num_matrices))   ## we have to attach matrices ot nodes
+        for idx, mat in enumerate(all_matrices_np):
+            G.add_node(idx, matrix=mat)
+
+
+        # Edge j -> i whenever Matrix(j) - Matrix(i) has no negative entries,
+        # tested for all pairs at once on the bit-packed matrices.
+        bits = pack_matrices(all_matrices_np)
+        G.graph["matrix_index"] = MatrixIndex(range(num_matrices), bits, all_matrices_np[0].shape)
+        edges = dominance_edges(bits)
+        G.add_edges_from(edges.tolist())
+        print("Graph constructed with {} vertices and {} edges.".format(G.number_of_nodes(), G.number_of_edges()))
+
+        # transitive reduction of the graph, straight from the cover relation
+        # (nodes keep their 'matrix' attributes)
+        reduced_edges = hasse_edges(bits)
+        G_reduced = nx.DiGraph(matrix_index=G.graph["matrix_index"])
+        G_reduced.add_nodes_from(G.nodes(data=True))
+        G_reduced.add_edges_from(reduced_edges.tolist())
+        print("Transitive reduction has {} vertices and {} edges.".format(G_reduced.number_of_nodes(), G_reduced.number_of_edges()))
+
+        save_graph(graph_file, bits, all_matrices_np[0].shape, edges, reduced_edges)
+        print(f"Cached G and its transitive reduction in '{graph_file}'")
+
+    if write_csv:
+        adj_matrix = nx.to_numpy_array(G, dtype=int)
+        df_adj = pd.DataFrame(adj_matrix, index=range(num_matrices), columns=range(num_matrices))
+        output_file_csv = os.path.join(script_dir, "final_graph_adjacency-posets_n5.csv")
+        df_adj.to_csv(output_file_csv)
+        print(f"Saved the adjacency matrix of final graph G to '{output_file_csv}'")
+        print(f"graph G has {adj_matrix.shape[0]} rows and {adj_matrix.shape[1]} columns.")
+
+        adj_matrix_reduced = nx.to_numpy_array(G_reduced, dtype=int)
+        df_adj_reduced = pd.DataFrame(adj_matrix_reduced, index=range(num_matrices), columns=range(num_matrices))
+        output_file_reduced_csv = os.path.join(script_dir, "final_graph_adjacency-posets_n5_transitive_reduction.csv")
+        df_adj_reduced.to_csv(output_file_reduced_csv)
+        print(f"Saved the transitive reduction adjacency matrix to '{output_file_reduced_csv}'")
 
     mat_i = G.nodes[8]['matrix']
     mat_j = G.nodes[2]['matrix']
@@ -117,21 +121,19 @@ def build_graph():
     #####
 
 
-    reachibility_matrix = np.zeros((num_matrices,num_matrices), dtype= int)
-
-    for i in range(num_matrices):
-        reachable = nx.descendants(G_undirected,i)
-        for j in reachable:
-            reachibility_matrix[i][j]=1
-            
-    np.fill_diagonal(reachibility_matrix,1)
+    # closure rows as packed bitsets, saved in binary (reachability.py)
+    reachability = ReachabilityIndex.from_graph(G_undirected)
+    output_file_reachability = os.path.join(script_dir, "reachability_index-posets_n5.npz")
+    reachability.save(output_file_reachability)
+    print(f"Saved reachability index to '{output_file_reachability}'")
 
-    df_reachability = pd.DataFrame(reachibility_matrix, index=range(num_matrices), columns=range(num_matrices))
-    output_file_reachability_matrix = os.path.join(script_dir, "reachability_matrix-posets_n5.csv")
-    df_reachability.to_csv(output_file_reachability_matrix)
-    print(f"Saved reachability matrix to '{output_file_reachability_matrix}'")
+    if write_csv:
+        df_reachability = pd.DataFrame(reachability.to_dense(), index=range(num_matrices), columns=range(num_matrices))
+        output_file_reachability_matrix = os.path.join(script_dir, "reachability_matrix-posets_n5.csv")
+        df_reachability.to_csv(output_file_reachability_matrix)
+        print(f"Saved reachability matrix to '{output_file_reachability_matrix}'")
     
     return G, G_reduced
 
 if __name__ == "__main__":
-    G, G_reduced = build_graph()
+    G, G_reduced = build_graph(write_csv=True)
@@ -0,0 +1,72 @@
+"""
+On-disk cache of the matrix graph G and its transitive reduction.
+
+An entry is one NPZ file holding the bit-packed node matrices, G's edge
+list and the reduction's edge list. It is content-addressed: the file
+name is a hash of the input JSON's bytes plus the edge direction
+convention, so editing the JSON or flipping the direction simply misses
+the cache and a stale entry is never read.
+"""
+import hashlib
+import os
+import networkx as nx
+import numpy as np
+from dominance import unpack_matrices
+from matrix_index import MatrixIndex
+
+VERSION = 1  # bump when the stored layout changes
+
+# edges point from the dominating matrix to the dominated one
+DOMINATING_TO_DOMINATED = "dominating->dominated"
+
+
+def cache_key(json_file, direction=DOMINATING_TO_DOMINATED):
+    h = hashlib.sha1()
+    with open(json_file, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    h.update(f"|{direction}|v{VERSION}".encode())
+    return h.hexdigest()
+
+
+def cache_file(json_file, direction=DOMINATING_TO_DOMINATED, cache_dir=None):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(json_file)), "graph_cache")
+    return os.path.join(cache_dir, cache_key(json_file, direction) + ".npz")
+
+
+def save_graph(path, bits, shape, edges, reduced_edges):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.savez(f, bits=np.asarray(bits, dtype=np.uint64), shape=np.asarray(shape),
+                 edges=np.asarray(edges, dtype=np.int32), reduced_edges=np.asarray(reduced_edges, dtype=np.int32))
+    os.replace(tmp, path)
+
+
+def load_graph(path):
+    """(bits, shape, edges, reduced_edges), or None when there is no entry."""
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return data["bits"], tuple(data["shape"]), data["edges"], data["reduced_edges"]
+
+
+def graphs_from_arrays(bits, shape, edges, reduced_edges, full=True):
+    """
+    G and G_reduced as build_graph returns them, nodes carrying their 'matrix'
+    and both sharing a MatrixIndex in G.graph["matrix_index"]. With
+    full=False G (all the dominance edges, by far the slowest part to
+    rebuild) is skipped and None is returned in its place.
+    """
+    matrices = unpack_matrices(bits, shape)
+    G_reduced = nx.DiGraph(matrix_index=MatrixIndex(range(len(matrices)), bits, shape))
+    for idx in range(len(matrices)):
+        G_reduced.add_node(idx, matrix=matrices[idx])
+    G_reduced.add_edges_from(reduced_edges.tolist())
+
+    G = None
+    if full:
+        G = nx.DiGraph(matrix_index=G_reduced.graph["matrix_index"])
+        G.add_nodes_from(G_reduced.nodes(data=True))
+        G.add_edges_from(edges.tolist())
+    return G, G_reduced
@@ -3,6 +3,11 @@ import numpy as np
 import json
 import os
 import pandas as pd
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from dominance import pack_matrices, dominance_edges, hasse_edges
+from graph_cache import cache_file, load_graph, save_graph, graphs_from_arrays
 
 def find_common_descendants(G, nodes):
     if not nodes:
@@ -15,92 +20,89 @@ def find_common_descendants(G, nodes):
     return common
 
 
-def build_graph():
+def build_graph(write_csv=False, use_cache=True, full=True, verbose=True):
+    """
+    G (edges from each matrix to every matrix it dominates) and its
+    transitive reduction. Both are cached under graph_cache/, keyed by the
+    JSON's content, so later runs load them instead of rebuilding;
+    write_csv=True also writes the dense adjacency CSVs. full=False skips
+    building G (returned as None) for callers that only use the reduction;
+    verbose=False keeps it quiet.
+    """
     script_dir = os.path.dirname(os.path.abspath(__file__))
     json_file = os.path.join(script_dir, "hasse_diagrams_n5.json") #connected hasse only
-
-    with open(json_file, "r") as f:
-        hasse_results = json.load(f)
-
-    if isinstance(hasse_results, dict):
-        all_matrices = []
-        for m in sorted(hasse_results.keys(), key=int):
-            all_matrices.extend(hasse_results[m])
-    elif isinstance(hasse_results, list):
-        all_matrices = hasse_results
+    graph_file = cache_file(json_file)
+    full = full or write_csv
+
+    cached = load_graph(graph_file) if use_cache else None
+    if cached is not None:
+        bits, shape, edges, reduced_edges = cached
+        if verbose:
+            print(f"Loaded G and its transitive reduction from '{graph_file}'")
     else:
-        raise TypeError("hasse_diagrams_n5.json")
-
-
-    num_matrices = len(all_matrices)
-    print("Total matrices:", num_matrices)  #219
-
-    # matrix to NumPy arr
-    all_matrices_np = [np.array(mat) for mat in all_matrices]
-
-
-    G = nx.DiGraph()
-    ##G.add_nodes_from(range(num_matrices))   ## we have to attach matrices ot nodes
-    for idx, mat in enumerate(all_matrices_np):
-        G.add_node(idx, matrix=mat)
-
-
-    # For each unordered pair (i, j), check if Matrix(j) - Matrix(i) has no negative entries.
-    for i in range(num_matrices):
-        for j in range(i + 1, num_matrices):
-            
-            diff_ij = all_matrices_np[j] - all_matrices_np[i]
-            if np.all(diff_ij <= 0): #changed
-                #G.add_edge(i, j)
-                ##G.add_edge(j, i)
-                G.add_edge(i, j)
-            
-            diff_ji = all_matrices_np[i] - all_matrices_np[j]
-            if np.all(diff_ji <= 0): #changed
-                #G.add_edge(j, i)
-                ##G.add_edge(i, j)
-                G.add_edge(j, i)
-
-    print("Graph constructed with {} vertices and {} edges.".format(G.number_of_nodes(), G.number_of_edges()))
-    adj_matrix = nx.to_numpy_array(G, dtype=int)
-    df_adj = pd.DataFrame(adj_matrix, index=range(num_matrices), columns=range(num_matrices))
-
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    output_file_csv = os.path.join(script_dir, "final_graph_adjacency-hasse_n5.csv")
-    df_adj.to_csv(output_file_csv)
-
-    print(f"Saved the adjacency matrix of final graph G to '{output_file_csv}'")
-
-    # to make sure howm any rows and columns we have
-    df_check = pd.read_csv(output_file_csv, index_col=0)
-    num_rows, num_cols = df_check.shape
-    print(f"\n")
-    print(f"graph G has {num_rows} rows and {num_cols} columns.")
-
-
-
-    # transitive reduction of the graph
-    G_reduced = nx.transitive_reduction(G)
-    # Preserve 'matrix' attributes from G to G_reduced
-    for node in G_reduced.nodes():
-        G_reduced.nodes[node]['matrix'] = G.nodes[node]['matrix']
-    print("Transitive reduction has {} vertices and {} edges.".format(G_reduced.number_of_nodes(), G_reduced.number_of_edges()))
-
-    adj_matrix_reduced = nx.to_numpy_array(G_reduced, dtype=int)
-    df_adj_reduced = pd.DataFrame(adj_matrix_reduced, index=range(num_matrices), columns=range(num_matrices))
-
-    output_file_reduced_csv = os.path.join(script_dir, "final_graph_adjacency-hasse_n5_transitive_reduction.csv")
-    df_adj_reduced.to_csv(output_file_reduced_csv)
-    print(f"Saved the transitive reduction adjacency matrix to '{output_file_reduced_csv}'")
+        with open(json_file, "r") as f:
+            hasse_results = json.load(f)
+
+        if isinstance(hasse_results, dict):
+            all_matrices = []
+            for m in sorted(hasse_results.keys(), key=int):
+                all_matrices.extend(hasse_results[m])
+        elif isinstance(hasse_results, list):
+            all_matrices = hasse_results
+        else:
+            raise TypeError("hasse_diagrams_n5.json")
+
+        if verbose:
+            print("Total matrices:", len(all_matrices))  #219
+
+        # matrix to NumPy arr
+        all_matrices_np = [np.array(mat) for mat in all_matrices]
+        shape = all_matrices_np[0].shape
+
+        # Edge i -> j whenever Matrix(j) - Matrix(i) has no positive entries,
+        # tested for all pairs at once on the bit-packed matrices.
+        bits = pack_matrices(all_matrices_np)
+        edges = dominance_edges(bits)
+
+        # transitive reduction of the graph, straight from the cover relation
+        reduced_edges = hasse_edges(bits)
+
+        save_graph(graph_file, bits, shape, edges, reduced_edges)
+        if verbose:
+            print(f"Cached G and its transitive reduction in '{graph_file}'")
+
+    # nodes carry their 'matrix'; both graphs share one MatrixIndex
+    G, G_reduced = graphs_from_arrays(bits, shape, edges, reduced_edges, full=full)
+    num_matrices = G_reduced.number_of_nodes()
+    if verbose:
+        print("Graph constructed with {} vertices and {} edges.".format(num_matrices, len(edges)))
+        print("Transitive reduction has {} vertices and {} edges.".format(num_matrices, len(reduced_edges)))
+
+    if write_csv:
+        adj_matrix = nx.to_numpy_array(G, dtype=int)
+        df_adj = pd.DataFrame(adj_matrix, index=range(num_matrices), columns=range(num_matrices))
+        output_file_csv = os.path.join(script_dir, "final_graph_adjacency-hasse_n5.csv")
+        df_adj.to_csv(output_file_csv)
+        if verbose:
+            print(f"Saved the adjacency matrix of final graph G to '{output_file_csv}'")
+            print(f"graph G has {adj_matrix.shape[0]} rows and {adj_matrix.shape[1]} columns.")
+
+        adj_matrix_reduced = nx.to_numpy_array(G_reduced, dtype=int)
+        df_adj_reduced = pd.DataFrame(adj_matrix_reduced, index=range(num_matrices), columns=range(num_matrices))
+        output_file_reduced_csv = os.path.join(script_dir, "final_graph_adjacency-hasse_n5_transitive_reduction.csv")
+        df_adj_reduced.to_csv(output_file_reduced_csv)
+        if verbose:
+            print(f"Saved the transitive reduction adjacency matrix to '{output_file_reduced_csv}'")
 
     
-    mat_j = G.nodes[343]['matrix']
-    mat_i = G.nodes[725]['matrix']
-    # mat_z = G.nodes[49]['matrix']
-    # mat_x = G.nodes[11]['matrix']
-    # mat_y = G.nodes[92]['matrix']
-    print(mat_j)
-    print(mat_i)
+    if verbose:
+        mat_j = G_reduced.nodes[343]['matrix']
+        mat_i = G_reduced.nodes[725]['matrix']
+        # mat_z = G.nodes[49]['matrix']
+        # mat_x = G.nodes[11]['matrix']
+        # mat_y = G.nodes[92]['matrix']
+        print(mat_j)
+        print(mat_i)
     # print(mat_z)
     # print(mat_x)
     # print(mat_y)
@@ -155,7 +157,7 @@ def build_graph():
     return G, G_reduced
 
 if __name__ == "__main__":
-    G, G_reduced = build_graph()
+    G, G_reduced = build_graph(write_csv=True)
 
 # print("\n--- Node Matrices ---")
 # for node in G.nodes():
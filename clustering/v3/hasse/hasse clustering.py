@@ -1,9 +1,13 @@
 from graphG_hasse import build_graph
+from reachability import descendants  # graphG_hasse puts clustering/v3 on sys.path
+from reach_sets import ReachSets
+from set_cover import greedy_cover
+from hasse_cluster import match, find_best_combos, plot_Gcp_coverage
 import json
 import numpy as np
 import os
 import networkx as nx
-from collections import defaultdict
+from collections import Counter, defaultdict
 import pandas as pd
 import matplotlib.pyplot as plt
 import matplotlib.colors as mcolors
@@ -20,170 +24,36 @@ timings = {}
 
 script_dir = os.path.dirname(__file__)
 mc_json = os.path.join(script_dir, "M_c_matrices_diagonal_1 ('e1', 'e2', 'e5', 'e6', 'e11') corrupted10%.json")
-with open(mc_json, "r") as f:
-    M_c_data = json.load(f)
-    
-    
-def plot_Gcp_coverage(G_cp, reach_sets, G, total_patients=125):
-
-    coverage = {
-        combo: len(set().union(*(reach_sets[n] for n in combo)))
-        for combo in G_cp.nodes
-    }
-
-    combo_relation_counts = {
-        combo: np.mean([np.sum(G.nodes[n]["matrix"]) for n in combo])
-        for combo in G_cp.nodes
-    }
-
-    grouped_combos = defaultdict(list)
-    for combo, avg_rel in combo_relation_counts.items():
-        relation_level = int(round(avg_rel))  # integer level
-        grouped_combos[relation_level].append(combo)
-
-    pos = {}
-    for y, level in enumerate(sorted(grouped_combos.keys(), reverse=True)):
-        combos = grouped_combos[level]
-        n = len(combos)
-        x_coords = np.linspace(-5, 5, n) if n > 1 else [0]
-        for x, combo in zip(x_coords, combos):
-            pos[combo] = (x, level)
-
-    values = list(coverage.values())
-    norm = mcolors.LogNorm(vmin=1, vmax=max(values))
-    cmap = plt.cm.YlOrRd
-    node_colors = [cmap(norm(coverage[c])) for c in G_cp.nodes]
-
-    fig, ax = plt.subplots(figsize=(18, 12))
-    nx.draw_networkx_nodes(
-        G_cp, pos, node_color=node_colors,
-        node_size=400, ax=ax, alpha=0.9
-    )
-    nx.draw_networkx_edges(
-        G_cp, pos, arrows=True, ax=ax,
-        edge_color="gray", width=1, alpha=0.5
-    )
-
-    combo_labels = {
-        combo: ",".join(map(str, combo)) for combo in G_cp.nodes
-    }
-    nx.draw_networkx_labels(
-        G_cp, pos, labels=combo_labels, font_size=8, ax=ax
-    )
-
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-    sm.set_array([])
-    fig.colorbar(sm, ax=ax, label="Coverage Count (log scale)")
-
-    ax.set_title("G_cp Combo Graph – Hasse-style Reachability Layout", fontsize=14)
-    ax.axis("off")
-    plt.tight_layout()
-    plt.show()
-
-
-
-    
-def find_best_combos(M, T_percent, reach_sets, G, total_patients=125):
-    
-    T = int(total_patients * T_percent / 100)
-    all_nodes = [n for n in reach_sets if n != 0]  # skip node 0
-
-    print(f"\nFinding combinations with size {M} with ≥{T_percent}% coverage ({T} patients)...")
-
-    # Step 1: Find qualified combos
-    qualified_combos = set()
-    for size in range(1, M + 1):
-        for combo in combinations(all_nodes, size):
-            union_mc = set().union(*(reach_sets[n] for n in combo))
-            if len(union_mc) >= T:
-                qualified_combos.add(tuple(sorted(combo)))
-
-    print(f"Found {len(qualified_combos)} high-coverage combinations.")
-    
-    # Step 2: Build directed graph G_cp
-    G_cp = nx.DiGraph()
-    for c in qualified_combos:
-        G_cp.add_node(c)
-
-    # Check descendant
-    def all_nodes_covered_by_descendants(source_combo, target_combo):
-        for g in source_combo:
-            reachable = nx.descendants(G, g) | {g}
-            if not any(h in reachable for h in target_combo):
-                return False
-        return True
-
-    for a in qualified_combos:
-        for b in qualified_combos:
-            if a != b and all_nodes_covered_by_descendants(a, b):
-                G_cp.add_edge(a, b)
-
-    print(f"G_cp has {G_cp.number_of_nodes()} nodes and {G_cp.number_of_edges()} edges.")
-
-    # Step 3: Find best combos = (no incoming edges)
-    best_combos = [node for node in G_cp.nodes if G_cp.in_degree(node) == 0]
-    print(f"Identified {len(best_combos)} best combinations (no incoming arrows).")
-
-    return best_combos, G_cp
-
-
-# remove diagonal from M_c
-def remove_diagonal(matrix):
-    return matrix * (1 - np.eye(matrix.shape[0], dtype=int))
-
-M_c_matrices = [
-    remove_diagonal(np.array(entry["M_c"], dtype=int))
-    for entry in M_c_data
-]
 
 
 # Build Hasse graph G
 from graphG_hasse import build_graph
 t0 = time.time()
-_, G = build_graph()  # You may use G_reduced if we want transitive reduction
-hasse_matrices = [(G.nodes[i]["matrix"]) for i in G.nodes]
+_, G = build_graph(full=False)  # only the transitive reduction is used
 hasseI = (G.nodes[10]["matrix"])
 timings["build_G_seconds"] = time.time() - t0
 print(hasseI)
 
-# Match M_c to a Hasse diagram node
+# Match M_c to a Hasse diagram node: one lookup of its bit-packed key
 t1 = time.time()
-M_c_to_H_idx = []
-for i, M_c in enumerate(M_c_matrices):
-    match_idx = None
-    for idx, H in enumerate(hasse_matrices):
-        if np.array_equal(M_c, H):
-            match_idx = idx
-            break
-    M_c_to_H_idx.append(match_idx)
-    
+M_c_to_H_idx = match(G, mc_json)  # diagonal removed
+total_patients = len(M_c_to_H_idx)  # one patient per M_c
 
+matched = Counter(idx for idx in M_c_to_H_idx if idx is not None)
+for idx, count in matched.most_common():
+    print(f"Hasse diagram node #{idx} matched by {count} M_c:")
+    print(np.array_str(G.nodes[idx]["matrix"]))
 
-    
-    print(f"\nM_c #{i} matched to Hasse diagram node #{match_idx}")
-    if match_idx is not None:
-        print("Matched Hasse diagram matrix:")
-        print(np.array_str(H))
-    else:
-        print("No match found.")
-
-
-# Count reachability: n(d) = number of M_c that d can reach
-reach_sets = defaultdict(set)
-n_d = defaultdict(int)
-for mc_idx, H_c in enumerate(M_c_to_H_idx):
-    if H_c is None:
-        continue
-    reach_sets[H_c].add(mc_idx)
-    n_d[H_c] += 1
-    S_c = nx.descendants(G, H_c)
-    for d in S_c:
-        reach_sets[d].add(mc_idx)
-        n_d[d] += 1
+
+# Count reachability: n(d) = number of M_c that d can reach, as one bit
+# per M_c pushed down G from each M_c's matched node
+reach = ReachSets.from_matches(G, M_c_to_H_idx)
+reach_sets = reach.to_sets()  # node-id order
+n_d = {node: int(count) for node, count in zip(reach.nodes, reach.counts()) if count}
 print("here are the reach sets for node 9 and 3")        
-print(reach_sets[9])
+print(reach_sets.get(9, set()))
 print("----------------------------------------")  
-print(reach_sets[3])
+print(reach_sets.get(3, set()))
 
 # Save reachability sets for all nodes
 reach_sets_all_nodes = {
@@ -201,9 +71,8 @@ print(f"Reachability sets for all nodes saved to: {reach_sets_file}")
 
 # Combine n(d) and len(reach_sets[d]) into one dictionary
 combined_stats = {
-    node: {"n(d)": n_d[node], "lnr": len(reach_sets[node]),"lnSC": len(nx.descendants(G, d))}
+    node: {"n(d)": n_d[node], "lnr": len(reach_sets[node]),"lnSC": len(descendants(G, node))}
     for node in n_d
-    for d in S_c
 }
 
 # Create DataFrame
@@ -604,32 +473,15 @@ print(df_result)
 
 #Greedy Approximate Algorithm for Set Cover Problem
 #------------------------------------------------------#
-total_patients = 125
 target_coverage = 0.85
 min_required = int(total_patients * target_coverage)
 
-remaining_patients = set(range(total_patients))
-covered_patients = set()
-selected_nodes = []
-nodes_to_consider = [node for node in reach_sets if node != 0]
-
-while len(covered_patients) < min_required and nodes_to_consider:
-    # node covering most patients
-    best_node = max(
-        nodes_to_consider,
-        key=lambda n: len(reach_sets[n] - covered_patients)
-    )
-    new_covered = reach_sets[best_node] - covered_patients
-
-    if not new_covered:
-        break
-
-    selected_nodes.append(best_node)
-    covered_patients.update(new_covered)
-    nodes_to_consider.remove(best_node)
+# lazy greedy over the reach bitsets (set_cover.exact_cover gives an
+# optimal cover for small inputs)
+nodes_to_consider = [node for node in reach.discovery_order(G) if node != 0]  # old reach_sets order for ties
+selected_nodes, coverage_count = greedy_cover(reach, nodes_to_consider, min_required)
 
 # result
-coverage_count = len(covered_patients)
 coverage_percent = coverage_count / total_patients
 print(f"\n Greedy Set Cover Result (excluding node 0):")
 print(f"Selected Nodes: {selected_nodes}")
@@ -681,7 +533,7 @@ print(f"Greedy cover saved to: {output_path}")
 M = 2     
 T = 90     
 
-best_combos, G_cp = find_best_combos(M, T, reach_sets, G)
+best_combos, G_cp = find_best_combos(M, T, reach, G, total_patients)
 
 timings["hasse_clustering_seconds"] = time.time() - t1
 
@@ -704,7 +556,7 @@ with open(os.path.join(script_dir, "timings_hasse_pipeline.json"), "w") as f:
     json.dump(timings, f, indent=2)
 
 
-plot_Gcp_coverage(G_cp, reach_sets, G)
+plot_Gcp_coverage(G_cp, reach, G)
 
 
 
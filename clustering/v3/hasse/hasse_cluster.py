@@ -0,0 +1,291 @@
+"""
+Hasse clustering pipeline, as stages that can be run unattended:
+
+    load_graph -> match -> reach_sets -> combos -> set_cover -> export
+
+    python hasse_cluster.py --mc-json "M_c_matrices_diagonal_1 (...) corrupted10%.json" --M 2 --T 90
+    python hasse_cluster.py --config sweep_point.json --plot
+
+Every parameter is in CONFIG and can be set from a JSON config file and/or
+the command line (command line wins). The number of patients comes from
+the M_c JSON itself, one per M_c, unless total_patients is given.
+Plotting is off unless asked for.
+"""
+import argparse
+import json
+import os
+import time
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+from graphG_hasse import build_graph
+from reachability import closure  # graphG_hasse puts clustering/v3 on sys.path
+from matrix_index import matrix_index
+from reach_sets import ReachSets
+from combo_search import qualified_combos, combinations_order
+from combo_dominance import ComboDominance
+from set_cover import greedy_cover, exact_cover
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+STAGES = ("load_graph", "match", "reach_sets", "combos", "set_cover", "export")
+
+CONFIG = {
+    "mc_json": os.path.join(script_dir, "..", "..", "..", "dependency_matrices", "v3", "outputs",
+                            "M_c_matrices_diagonal_1 ('e1', 'e2', 'e5', 'e6', 'e11') corrupted10%.json"),
+    "out_dir": None,           # None: this script's directory
+    "M": 2,                    # largest combo size
+    "T": 90,                   # combo coverage threshold, % of patients
+    "target_coverage": 0.85,   # set cover target, fraction of patients
+    "total_patients": None,    # None: the number of M_c in mc_json
+    "skip_nodes": [0],         # never used in combos or covers (node 0 is the empty diagram)
+    "exact_cover": False,      # branch and bound instead of the greedy cover
+    "use_cache": True,         # load G from graph_cache/ when possible
+    "until": "export",         # last stage to run
+    "plot": False,             # draw G_cp (needs matplotlib, blocks on plt.show())
+    "verbose": True,
+}
+
+
+def load_graph(use_cache=True, verbose=True):
+    """The Hasse graph (transitive reduction) with its closure index attached."""
+    _, G = build_graph(use_cache=use_cache, full=False, verbose=verbose)
+    closure(G)
+    return G
+
+
+def match(G, mc_json, verbose=True):
+    """Hasse node per M_c of an M_c JSON, diagonal removed (None where there is none)."""
+    M_c_to_H_idx = matrix_index(G).match_json(mc_json)
+    if verbose:
+        matched = Counter(idx for idx in M_c_to_H_idx if idx is not None)
+        print(f"\nMatched {sum(matched.values())} of {len(M_c_to_H_idx)} M_c to {len(matched)} Hasse diagram nodes.")
+        unmatched = [i for i, idx in enumerate(M_c_to_H_idx) if idx is None]
+        if unmatched:
+            print(f"No match found for M_c #{unmatched}")
+    return M_c_to_H_idx
+
+
+def find_best_combos(M, T_percent, reach, G, total_patients, with_graph=True, skip_nodes=(0,), verbose=True):
+    """
+    Combos of up to M nodes covering at least T_percent of the patients, and
+    the best of them: those no other qualified combo dominates (a -> b when
+    every node of a has a descendant-or-self in b). Returns
+    (best_combos, G_cp), G_cp None unless with_graph.
+    """
+    T = int(total_patients * T_percent / 100)
+    all_nodes = [n for n in reach.discovery_order(G) if n not in skip_nodes]
+    if verbose:
+        print(f"\nFinding combinations with size {M} with ≥{T_percent}% coverage ({T} patients)...")
+
+    # the old loop added combos to a set in itertools.combinations order over
+    # the old reach_sets order; a set filled the same way iterates the same
+    # way, so G_cp's nodes and edges and best_combos keep the old order
+    qualified = set(combinations_order(qualified_combos(reach, all_nodes, M, T), all_nodes))
+    dominance = ComboDominance(closure(G), qualified)
+    best_combos = dominance.sources()
+    G_cp = dominance.graph() if with_graph else None
+
+    if verbose:
+        print(f"Found {len(qualified)} high-coverage combinations.")
+        if G_cp is not None:
+            print(f"G_cp has {G_cp.number_of_nodes()} nodes and {G_cp.number_of_edges()} edges.")
+        print(f"Identified {len(best_combos)} best combinations (no incoming arrows).")
+    return best_combos, G_cp
+
+
+def cover(reach, G, total_patients, target_coverage, skip_nodes=(0,), exact=False):
+    """Set cover of the patients by Hasse nodes, as greedy_set_cover_result.json stores it."""
+    min_required = int(total_patients * target_coverage)
+    # ties go to the node the old reach_sets dict listed first
+    nodes = [n for n in reach.discovery_order(G) if n not in skip_nodes]
+    selected_nodes, coverage_count = (exact_cover if exact else greedy_cover)(reach, nodes, min_required)
+    coverage_percent = coverage_count / total_patients if total_patients else 0.0
+    return {
+        "selected_nodes": selected_nodes,
+        "coverage_count": coverage_count,
+        "coverage_percent": f"{coverage_percent:.2%}",
+    }
+
+
+def plot_Gcp_coverage(G_cp, reach, G):
+    import matplotlib.pyplot as plt
+    import matplotlib.colors as mcolors
+    import networkx as nx
+
+    coverage = {combo: reach.union_count(combo) for combo in G_cp.nodes}
+
+    combo_relation_counts = {
+        combo: np.mean([np.sum(G.nodes[n]["matrix"]) for n in combo])
+        for combo in G_cp.nodes
+    }
+
+    grouped_combos = defaultdict(list)
+    for combo, avg_rel in combo_relation_counts.items():
+        relation_level = int(round(avg_rel))  # integer level
+        grouped_combos[relation_level].append(combo)
+
+    pos = {}
+    for y, level in enumerate(sorted(grouped_combos.keys(), reverse=True)):
+        combos = grouped_combos[level]
+        n = len(combos)
+        x_coords = np.linspace(-5, 5, n) if n > 1 else [0]
+        for x, combo in zip(x_coords, combos):
+            pos[combo] = (x, level)
+
+    values = list(coverage.values())
+    norm = mcolors.LogNorm(vmin=1, vmax=max(values))
+    cmap = plt.cm.YlOrRd
+    node_colors = [cmap(norm(coverage[c])) for c in G_cp.nodes]
+
+    fig, ax = plt.subplots(figsize=(18, 12))
+    nx.draw_networkx_nodes(
+        G_cp, pos, node_color=node_colors,
+        node_size=400, ax=ax, alpha=0.9
+    )
+    nx.draw_networkx_edges(
+        G_cp, pos, arrows=True, ax=ax,
+        edge_color="gray", width=1, alpha=0.5
+    )
+
+    combo_labels = {
+        combo: ",".join(map(str, combo)) for combo in G_cp.nodes
+    }
+    nx.draw_networkx_labels(
+        G_cp, pos, labels=combo_labels, font_size=8, ax=ax
+    )
+
+    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm.set_array([])
+    fig.colorbar(sm, ax=ax, label="Coverage Count (log scale)")
+
+    ax.set_title("G_cp Combo Graph – Hasse-style Reachability Layout", fontsize=14)
+    ax.axis("off")
+    plt.tight_layout()
+    plt.show()
+
+
+def export(results, out_dir):
+    """best_combos.csv/.json, greedy_set_cover_result.json, reach_sets_all_nodes.json, timings."""
+    os.makedirs(out_dir, exist_ok=True)
+    written = []
+    if "reach" in results:
+        reach = results["reach"]
+        reach_sets_all_nodes = {str(node): reach.members(node) for node in reach.covering_nodes()}
+        written.append(os.path.join(out_dir, "reach_sets_all_nodes.json"))
+        with open(written[-1], "w") as f:
+            json.dump(reach_sets_all_nodes, f, indent=2)
+    if "best_combos" in results:
+        written.append(os.path.join(out_dir, "best_combos.csv"))
+        pd.DataFrame(results["best_combos"]).to_csv(written[-1], index=False)
+        written.append(os.path.join(out_dir, "best_combos.json"))
+        with open(written[-1], "w") as f:
+            json.dump(results["best_combos"], f, indent=2)
+    if "set_cover" in results:
+        written.append(os.path.join(out_dir, "greedy_set_cover_result.json"))
+        with open(written[-1], "w") as f:
+            json.dump(results["set_cover"], f, indent=2)
+    written.append(os.path.join(out_dir, "timings_hasse_pipeline.json"))
+    with open(written[-1], "w") as f:
+        json.dump(results["timings"], f, indent=2)
+    return written
+
+
+def run(config=None, G=None, **overrides):
+    """
+    Run the stages up to config["until"] and return their results
+    (G, M_c_to_H_idx, reach, best_combos, G_cp, set_cover, timings, ...).
+    Pass G to reuse an already loaded graph.
+    """
+    config = {**CONFIG, **(config or {}), **overrides}
+    last = STAGES.index(config["until"])
+    verbose = config["verbose"]
+    results = {"config": config, "timings": {}}
+    timings = results["timings"]
+
+    t = time.time()
+    results["G"] = G = G if G is not None else load_graph(config["use_cache"], verbose)
+    timings["load_graph_seconds"] = time.time() - t
+    if last < STAGES.index("match"):
+        return results
+
+    t = time.time()
+    results["M_c_to_H_idx"] = match(G, config["mc_json"], verbose)
+    results["total_patients"] = total = config["total_patients"] or len(results["M_c_to_H_idx"])
+    timings["match_seconds"] = time.time() - t
+    if last < STAGES.index("reach_sets"):
+        return results
+
+    t = time.time()
+    results["reach"] = reach = ReachSets.from_matches(G, results["M_c_to_H_idx"])
+    timings["reach_sets_seconds"] = time.time() - t
+    if last < STAGES.index("combos"):
+        return results
+
+    t = time.time()
+    results["best_combos"], results["G_cp"] = find_best_combos(
+        config["M"], config["T"], reach, G, total,
+        with_graph=config["plot"], skip_nodes=config["skip_nodes"], verbose=verbose)
+    timings["combos_seconds"] = time.time() - t
+    if verbose:
+        for i, combo in enumerate(results["best_combos"][:10]):  # Print top 10 for inspection
+            print(f"Best Combo #{i+1}: {combo}")
+    if last < STAGES.index("set_cover"):
+        return results
+
+    t = time.time()
+    results["set_cover"] = cover(reach, G, total, config["target_coverage"],
+                                 skip_nodes=config["skip_nodes"], exact=config["exact_cover"])
+    timings["set_cover_seconds"] = time.time() - t
+    if verbose:
+        greedy = results["set_cover"]
+        print(f"\n Set Cover Result (excluding nodes {config['skip_nodes']}):")
+        print(f"Selected Nodes: {greedy['selected_nodes']}")
+        print(f"Patients Covered: {greedy['coverage_count']} / {total} ({greedy['coverage_percent']})")
+    if last < STAGES.index("export"):
+        return results
+
+    out_dir = config["out_dir"] or script_dir
+    for path in export(results, out_dir):
+        if verbose:
+            print(f"Saved '{path}'")
+
+    if config["plot"]:
+        plot_Gcp_coverage(results["G_cp"], reach, G)
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Hasse diagram clustering of M_c matrices.")
+    parser.add_argument("--config", help="JSON file with any of the CONFIG keys")
+    parser.add_argument("--mc-json", dest="mc_json")
+    parser.add_argument("--out-dir", dest="out_dir")
+    parser.add_argument("--M", type=int)
+    parser.add_argument("--T", type=float)
+    parser.add_argument("--target-coverage", dest="target_coverage", type=float)
+    parser.add_argument("--total-patients", dest="total_patients", type=int)
+    parser.add_argument("--skip-nodes", dest="skip_nodes", type=int, nargs="*")
+    parser.add_argument("--exact-cover", dest="exact_cover", action="store_true", default=None)
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false", default=None)
+    parser.add_argument("--until", choices=STAGES)
+    parser.add_argument("--plot", action="store_true", default=None)
+    parser.add_argument("--quiet", dest="verbose", action="store_false", default=None)
+    args = parser.parse_args(argv)
+
+    config = {}
+    if args.config:
+        with open(args.config, "r") as f:
+            config.update(json.load(f))
+    unknown = set(config) - set(CONFIG)
+    if unknown:
+        parser.error(f"unknown config keys: {sorted(unknown)}")
+    config.update({key: value for key, value in vars(args).items() if key != "config" and value is not None})
+    return config
+
+
+def main(argv=None):
+    return run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Parameter sweep for the Hasse clustering over a (M, T, M_c JSON) grid.
+
+G and its closure are loaded once, and each M_c JSON (e.g. one per
+corruption level) is matched and turned into reach sets once. The grid
+points then run in a process pool: the workers are forked after all of
+that is built, so they read G, the closure and the reach bitsets from the
+parent's memory instead of rebuilding or unpickling them. Every point
+becomes one row of the results table, with its timings.
+
+    python hasse_sweep.py --mc-json "M_c_matrices_diagonal_1*corrupted*.json" --M 1 2 3 --T 80 90 95 --out sweep.csv
+"""
+import argparse
+import glob
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import pandas as pd
+from hasse_cluster import CONFIG, load_graph, run, find_best_combos, cover
+
+# read-only state for the workers, filled in before the pool forks
+_shared = {}
+
+
+def prepare(mc_files, use_cache=True):
+    """Load G once and the reach sets of every M_c JSON; returns per-file prep rows."""
+    t = time.time()
+    _shared["G"] = G = load_graph(use_cache, verbose=False)
+    load_seconds = time.time() - t
+
+    _shared["reach"], _shared["total"] = {}, {}
+    prep = {}
+    for path in mc_files:
+        results = run(mc_json=path, G=G, until="reach_sets", verbose=False)
+        _shared["reach"][path] = results["reach"]
+        _shared["total"][path] = results["total_patients"]
+        matched = sum(idx is not None for idx in results["M_c_to_H_idx"])
+        prep[path] = {
+            "total_patients": results["total_patients"],
+            "matched": matched,
+            "match_seconds": results["timings"]["match_seconds"],
+            "reach_sets_seconds": results["timings"]["reach_sets_seconds"],
+        }
+    return load_seconds, prep
+
+
+def evaluate(point):
+    """One grid point against the shared structures."""
+    path, M, T, target_coverage, skip_nodes = point
+    G, reach, total = _shared["G"], _shared["reach"][path], _shared["total"][path]
+
+    t = time.time()
+    best_combos, _ = find_best_combos(M, T, reach, G, total, with_graph=False,
+                                      skip_nodes=skip_nodes, verbose=False)
+    combos_seconds = time.time() - t
+
+    t = time.time()
+    greedy = cover(reach, G, total, target_coverage, skip_nodes=skip_nodes)
+    set_cover_seconds = time.time() - t
+
+    return {
+        "mc_json": os.path.basename(path),
+        "M": M,
+        "T": T,
+        "target_coverage": target_coverage,
+        "best_combos_count": len(best_combos),
+        "best_combos": json.dumps([list(combo) for combo in best_combos]),
+        "cover_nodes": json.dumps(greedy["selected_nodes"]),
+        "cover_count": greedy["coverage_count"],
+        "cover_percent": greedy["coverage_percent"],
+        "combos_seconds": combos_seconds,
+        "set_cover_seconds": set_cover_seconds,
+    }
+
+
+def sweep(mc_files, Ms, Ts, target_coverage=CONFIG["target_coverage"], skip_nodes=CONFIG["skip_nodes"],
+          workers=None, use_cache=True):
+    """The results table (a DataFrame, one row per grid point in grid order)."""
+    t = time.time()
+    load_seconds, prep = prepare(mc_files, use_cache)
+    points = [(path, M, T, target_coverage, tuple(skip_nodes)) for path, M, T in product(mc_files, Ms, Ts)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and "fork" in multiprocessing.get_all_start_methods():
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("fork")) as pool:
+            rows = list(pool.map(evaluate, points))
+    else:  # no fork (e.g. Windows): run in this process
+        rows = [evaluate(point) for point in points]
+
+    for row, point in zip(rows, points):
+        row.update(prep[point[0]])
+    df = pd.DataFrame(rows)
+    df.attrs["load_graph_seconds"] = load_seconds
+    df.attrs["total_seconds"] = time.time() - t
+    return df
+
+
+def expand(patterns):
+    paths = []
+    for pattern in patterns:
+        found = sorted(glob.glob(pattern)) or [pattern]
+        paths.extend(path for path in found if path not in paths)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep the Hasse clustering over M, T and M_c JSONs.")
+    parser.add_argument("--mc-json", dest="mc_json", nargs="+", default=[CONFIG["mc_json"]],
+                        help="M_c JSON files or glob patterns, e.g. one per corruption level")
+    parser.add_argument("--M", type=int, nargs="+", default=[CONFIG["M"]])
+    parser.add_argument("--T", type=float, nargs="+", default=[CONFIG["T"]])
+    parser.add_argument("--target-coverage", dest="target_coverage", type=float, default=CONFIG["target_coverage"])
+    parser.add_argument("--skip-nodes", dest="skip_nodes", type=int, nargs="*", default=CONFIG["skip_nodes"])
+    parser.add_argument("--workers", type=int, default=None, help="default: one per CPU")
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false")
+    parser.add_argument("--out", default="hasse_sweep_results.csv")
+    args = parser.parse_args()
+
+    df = sweep(expand(args.mc_json), args.M, args.T, args.target_coverage, args.skip_nodes,
+               args.workers, args.use_cache)
+    df.to_csv(args.out, index=False)
+    print(df[["mc_json", "M", "T", "best_combos_count", "cover_count", "cover_percent", "combos_seconds"]])
+    print(f"Loaded G in {df.attrs['load_graph_seconds']:.2f} s; sweep took {df.attrs['total_seconds']:.2f} s.")
+    print(f"Saved {len(df)} rows to '{args.out}'")
@@ -0,0 +1,71 @@
+"""
+Exact-match index from 0/1 matrices to graph nodes.
+
+Each node's matrix is keyed by its bit-packed integer (dominance.py), so
+finding the Hasse node of an observed M_c is one dict lookup, and a whole
+batch is one np.searchsorted over the sorted keys.
+"""
+import json
+import numpy as np
+from dominance import pack_matrices
+
+
+class MatrixIndex:
+
+    def __init__(self, nodes, bits, shape):
+        self.shape = tuple(shape)
+        bits = np.asarray(bits, dtype=np.uint64)
+        order = np.argsort(bits, kind="stable")
+        keys, nodes = bits[order], np.asarray(nodes)[order]
+        first = np.r_[True, keys[1:] != keys[:-1]]  # the first node wins on duplicates
+        self.keys, self.nodes = keys[first], nodes[first]
+        self.lookup = dict(zip(self.keys.tolist(), self.nodes.tolist()))
+
+    @classmethod
+    def from_matrices(cls, nodes, matrices):
+        matrices = np.asarray(matrices)
+        return cls(nodes, pack_matrices(matrices), matrices.shape[1:])
+
+    def _pack(self, matrices):
+        matrices = np.asarray(matrices)
+        if matrices.shape[1:] != self.shape:
+            raise ValueError(f"expected {self.shape} matrices, got {matrices.shape[1:]}")
+        return pack_matrices(matrices)
+
+    def get(self, matrix):
+        """Node whose matrix equals matrix, or None."""
+        return self.lookup.get(int(self._pack([matrix])[0]))
+
+    def match_array(self, matrices, missing=-1):
+        """Node per matrix as an int array, missing where there is none."""
+        if len(matrices) == 0:
+            return np.empty(0, dtype=np.int64)
+        bits = self._pack(matrices)
+        pos = np.minimum(np.searchsorted(self.keys, bits), len(self.keys) - 1)
+        found = self.keys[pos] == bits
+        return np.where(found, self.nodes[pos], missing)
+
+    def match(self, matrices):
+        """Node per matrix as a list, None where there is none."""
+        return [int(node) if node >= 0 else None for node in self.match_array(matrices)]
+
+    def match_json(self, path, key="M_c", remove_diagonal=True):
+        """Match every entry of an M_c JSON (as written by newAlgV4.py) at once."""
+        with open(path) as f:
+            matrices = np.array([entry[key] for entry in json.load(f)], dtype=int).reshape((-1,) + self.shape)
+        if remove_diagonal:
+            idx = np.arange(self.shape[0])
+            matrices[:, idx, idx] = 0
+        return self.match(matrices)
+
+
+def matrix_index(G):
+    """
+    G's MatrixIndex. build_graph stores it in G.graph["matrix_index"];
+    for any other graph it is built from the nodes' 'matrix' attributes.
+    """
+    index = G.graph.get("matrix_index")
+    if index is None:
+        nodes = list(G.nodes)
+        index = G.graph["matrix_index"] = MatrixIndex.from_matrices(nodes, [G.nodes[n]["matrix"] for n in nodes])
+    return index
@@ -0,0 +1,93 @@
+"""
+Reach sets: which observed M_c each graph node covers.
+
+A node d covers M_c #i when d is M_c #i's matched node or one of its
+descendants. Instead of adding i to a Python set for every descendant of
+every M_c, the M_c are first bucketed by matched node and then pushed down
+the DAG once, in topological order, as packed bitsets: row d has one bit
+per M_c (np.uint64 words), the OR of its own bucket and its parents' rows.
+Coverage is then a popcount and the coverage of a node combo the OR of its
+rows.
+"""
+import networkx as nx
+import numpy as np
+from dominance import popcount
+
+ONE = np.uint64(1)
+
+
+class ReachSets:
+
+    def __init__(self, nodes, rows, num_mc, matches=None):
+        self.nodes = list(nodes)
+        self.index = {node: i for i, node in enumerate(self.nodes)}
+        self.rows = rows
+        self.num_mc = num_mc
+        self.matches = matches
+        self._discovery_order = None
+
+    @classmethod
+    def from_matches(cls, G, matches):
+        """
+        G is the Hasse graph (a DAG, edges dominating -> dominated) and
+        matches[i] the node M_c #i matched, None when it matched none.
+        """
+        nodes = list(G.nodes)
+        index = {node: i for i, node in enumerate(nodes)}
+        rows = np.zeros((len(nodes), (len(matches) + 63) // 64), dtype=np.uint64)
+
+        # each M_c sets its own bit in its matched node's row
+        mc = np.array([i for i, node in enumerate(matches) if node is not None], dtype=np.int64)
+        at = np.array([index[node] for node in matches if node is not None], dtype=np.int64)
+        np.bitwise_or.at(rows, (at, mc >> 6), ONE << (mc & 63).astype(np.uint64))
+
+        for v in nx.topological_sort(G):
+            parents = [index[u] for u in G.predecessors(v)]
+            if parents:
+                rows[index[v]] |= np.bitwise_or.reduce(rows[parents], axis=0)
+        return cls(nodes, rows, len(matches), list(matches))
+
+    def row(self, u):
+        return self.rows[self.index[u]]
+
+    def count(self, u):
+        return int(popcount(self.row(u)).sum())
+
+    def counts(self):
+        """Number of M_c covered, per node in self.nodes order (n(d))."""
+        return popcount(self.rows).sum(axis=1)
+
+    def union(self, nodes):
+        return np.bitwise_or.reduce(self.rows[[self.index[u] for u in nodes]], axis=0)
+
+    def union_count(self, nodes):
+        return int(popcount(self.union(nodes)).sum())
+
+    def members(self, u):
+        """Indices of the M_c u covers, ascending."""
+        bits = np.unpackbits(self.row(u).view(np.uint8), bitorder="little", count=self.num_mc)
+        return np.flatnonzero(bits).tolist()
+
+    def covering_nodes(self):
+        """Nodes covering at least one M_c, in self.nodes order."""
+        return [self.nodes[i] for i in np.flatnonzero(self.rows.any(axis=1))]
+
+    def discovery_order(self, G):
+        """
+        Covering nodes in the order the old reach_sets dict listed them: M_c
+        by M_c, its matched node and then nx.descendants of it. Greedy covers
+        break ties in this order, as max() over that dict did. One traversal
+        per distinct matched node, done once.
+        """
+        if self._discovery_order is None:
+            seen = {}
+            for node in dict.fromkeys(u for u in self.matches if u is not None):
+                seen.setdefault(node)
+                for d in nx.descendants(G, node):
+                    seen.setdefault(d)
+            self._discovery_order = list(seen)
+        return self._discovery_order
+
+    def to_sets(self):
+        """The old reach_sets dict: {node: set of M_c indices} for covering nodes."""
+        return {u: set(self.members(u)) for u in self.covering_nodes()}
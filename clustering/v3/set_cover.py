@@ -0,0 +1,98 @@
+"""
+Set cover over reach bitsets: pick nodes until their rows (reach_sets.py)
+together cover at least `target` M_c.
+
+greedy_cover is the lazy greedy (CELF): a node's gain only shrinks as the
+cover grows, so a stale gain in the priority queue is an upper bound and
+only the node at the top needs re-evaluating. exact_cover is a
+branch-and-bound search for a cheapest cover, for small inputs.
+
+costs are optional, one per node (default 1); the greedy ranks nodes by
+gain / cost. To prefer nodes with more relations, pass costs that fall
+with np.sum(G.nodes[n]["matrix"]).
+"""
+import heapq
+import numpy as np
+from dominance import popcount
+
+
+def _setup(reach, nodes, costs):
+    nodes = list(nodes)
+    rows = reach.rows[[reach.index[u] for u in nodes]] if nodes else np.zeros((0, reach.rows.shape[1]), np.uint64)
+    costs = np.ones(len(nodes)) if costs is None else np.asarray(costs, dtype=float)
+    if len(costs) != len(nodes) or np.any(costs <= 0):
+        raise ValueError("costs must be one positive number per node")
+    return nodes, rows, costs
+
+
+def _gain(row, covered):
+    return int(popcount(row & ~covered).sum())
+
+
+def greedy_cover(reach, nodes, target, costs=None):
+    """
+    (selected nodes, number covered). Stops at target or when no node adds
+    anything; ties go to the node listed first, as with max() over nodes.
+    """
+    nodes, rows, costs = _setup(reach, nodes, costs)
+    covered = np.zeros(rows.shape[1], dtype=np.uint64)
+    count = 0
+    gains = popcount(rows).sum(axis=1).astype(np.int64)
+    heap = [(-gains[i] / costs[i], i, 0) for i in range(len(nodes)) if gains[i]]
+    heapq.heapify(heap)
+
+    selected = []
+    step = 0  # an entry is fresh when it was evaluated at the current step
+    while count < target and heap:
+        score, i, seen = heapq.heappop(heap)
+        if seen != step:
+            gain = _gain(rows[i], covered)
+            if gain:
+                heapq.heappush(heap, (-gain / costs[i], i, step))
+            continue
+        selected.append(nodes[i])
+        covered |= rows[i]
+        count = int(popcount(covered).sum())
+        step += 1
+    return selected, count
+
+
+def exact_cover(reach, nodes, target, costs=None):
+    """
+    A cheapest set of nodes covering at least target M_c, as
+    (selected nodes, number covered), or (None, 0) when even all of them
+    fall short. Exponential in the worst case: meant for small targets and
+    candidate lists, with the greedy cover as the starting bound.
+    """
+    nodes, rows, costs = _setup(reach, nodes, costs)
+    everything = np.bitwise_or.reduce(rows, axis=0) if len(nodes) else np.zeros(0, np.uint64)
+    if int(popcount(everything).sum()) < target:
+        return None, 0
+
+    order = np.argsort(-popcount(rows).sum(axis=1).astype(np.int64), kind="stable")
+    rows, costs = rows[order], costs[order]
+    greedy, _ = greedy_cover(reach, [nodes[i] for i in order], target, costs)
+    position = {nodes[i]: k for k, i in enumerate(order)}
+    best = {"cost": sum(costs[position[u]] for u in greedy), "picks": [position[u] for u in greedy]}
+
+    def search(start, union, count, cost, picks):
+        if count >= target:
+            if cost < best["cost"] - 1e-9:
+                best["cost"], best["picks"] = cost, list(picks)
+            return
+        gains = popcount(rows[start:] & ~union).sum(axis=1).astype(np.int64)
+        useful = np.flatnonzero(gains)
+        if len(useful) == 0:
+            return
+        # every further M_c costs at least the cheapest cost per new M_c
+        if cost + (target - count) * np.min(costs[start + useful] / gains[useful]) >= best["cost"] - 1e-9:
+            return
+        for k in useful:
+            j = start + k
+            picks.append(j)
+            search(j + 1, union | rows[j], count + int(gains[k]), cost + costs[j], picks)
+            picks.pop()
+
+    search(0, np.zeros(rows.shape[1], dtype=np.uint64), 0, 0.0, [])
+    selected = [nodes[order[j]] for j in best["picks"]]
+    return selected, int(popcount(np.bitwise_or.reduce(rows[best["picks"]], axis=0)).sum())
@@ -1,104 +1,119 @@
-import ast
+import glob
 import pandas as pd
 import os
-from collections import defaultdict
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import sequence_codec
 
 
 script_dir = os.path.dirname(os.path.abspath(__file__))
 
 CSV_FILE = os.path.join(script_dir, "sequence_of_sets_formattedV3.csv")
+# more inputs (paths or glob patterns, e.g. one CSV per training run) are counted together
+CSV_FILES = [CSV_FILE]
+CHUNK_ROWS = 100_000
+NUM_WORKERS = 1  # > 1 counts chunks in a process pool
 OUTPUT_FILE = os.path.join(script_dir, "event_pair_ordering_ratios.csv")
 LABEL_COLUMN = "label"  # contains "won" or "lost"
 
 
-def parse_sequence(seq_str):
-    try:
-        parsed = ast.literal_eval(seq_str)
-        return parsed if isinstance(parsed, list) else []
-    except:
-        return []
-
-# build full event set from both data
-def extract_event_set(df):
-    event_set = set()
-    for s in df["sequence"]:
-        parsed = parse_sequence(s)
-        for t in parsed:
-            elements = list(t) if isinstance(t, tuple) else [t]
-            event_set.update(elements)
-    return event_set
-
-# identify win/loss
-def is_winning_episode(seq_str):
-    parsed = parse_sequence(seq_str)
-    if not parsed:
-        return False
-    last_term = parsed[-1]
-    last_events = list(last_term) if isinstance(last_term, tuple) else [last_term]
-    return any(e in last_events for e in ["e9", "e12"])
-
-# check if e_i occurs before e_j in a sequence
-def occurs_before(seq, e_i, e_j):
-    seen_i, seen_j = None, None
-    for idx, term in enumerate(seq):
-        elements = list(term) if isinstance(term, tuple) else [term]
-        if e_i in elements and seen_i is None:
-            seen_i = idx
-        if e_j in elements and seen_j is None:
-            seen_j = idx
-    return (seen_i is not None and seen_j is not None and seen_i < seen_j)
-
-
-df_all = pd.read_csv(CSV_FILE)
-df_all["episode_won"] = df_all["sequence"].apply(is_winning_episode)
-df_won = df_all[df_all["episode_won"] == True]
-df_lost = df_all[df_all["episode_won"] == False]
-
-
-X = sorted(list(extract_event_set(df_all)))
-m = len(X)
-event_index = {e: i for i, e in enumerate(X)}
-
-# count W_ij and L_ij
-W, L = defaultdict(int), defaultdict(int)
-
-def count_orderings(df, counter_dict):
-    for row in df["sequence"]:
-        seq = parse_sequence(row)
-        for i in range(m):
-            for j in range(m):
-                if i != j and occurs_before(seq, X[i], X[j]):
-                    counter_dict[(i, j)] += 1
-
-count_orderings(df_won, W)
-count_orderings(df_lost, L)
-
-total_won = len(df_won)
-total_lost = len(df_lost)
-
-# compute R_ij = W_ij / L_ij
-records = []
-for i in range(m):
-    for j in range(m):
-        if i == j:
-            continue
-        w_ij = W.get((i, j), 0) / total_won if total_won else 0
-        l_ij = L.get((i, j), 0) / total_lost if total_lost else 0
-        if l_ij == 0:
-            R = float("inf") if w_ij > 0 else 0
-        else:
-            R = w_ij / l_ij
-
-        records.append({
-            "i": X[i],
-            "j": X[j],
-            "W_ij": round(w_ij, 4),
-            "L_ij": round(l_ij, 4),
-            "R_ij": R
-        })
-
-df_result = pd.DataFrame(records).sort_values(by="R_ij", ascending=False)
-df_result.to_csv(OUTPUT_FILE, index=False)
-
-print(f"Saved R_ij table to: {OUTPUT_FILE}")
-print(df_result.head(10))
+# counts[i, j] = number of rows where X[i] first occurs before X[j] does, for all pairs at once
+# (first: first term index per event, -1 if it never occurs)
+def count_orderings(first, chunk_rows=4096):
+    m = first.shape[1]
+    counts = np.zeros((m, m), dtype=np.int64)
+    for start in range(0, len(first), chunk_rows):
+        f = first[start:start + chunk_rows]
+        before = (f[:, :, None] >= 0) & (f[:, :, None] < f[:, None, :])
+        counts += before.sum(axis=0)
+    return counts
+
+
+# W, L and the win/loss totals for one chunk of encoded sequences, over the events it holds
+def count_chunk(encoded):
+    won = encoded.last_term_contains(["e9", "e12"])
+    first = encoded.first_positions()
+    present = np.flatnonzero((first >= 0).any(axis=0))
+    X = [encoded.events[k] for k in present]
+    first = first[:, present]
+    return X, count_orderings(first[won]), count_orderings(first[~won]), int(won.sum()), int((~won).sum())
+
+# sum chunk counts, aligning each chunk's events to the union of all of them
+def merge_counts(parts):
+    X = sorted(set().union(*(part[0] for part in parts)))
+    event_index = {e: i for i, e in enumerate(X)}
+    W = np.zeros((len(X), len(X)), dtype=np.int64)
+    L = np.zeros_like(W)
+    total_won = total_lost = 0
+    for X_part, W_part, L_part, won_part, lost_part in parts:
+        idx = np.array([event_index[e] for e in X_part], dtype=np.intp)
+        W[np.ix_(idx, idx)] += W_part
+        L[np.ix_(idx, idx)] += L_part
+        total_won += won_part
+        total_lost += lost_part
+    return X, W, L, total_won, total_lost
+
+def expand_paths(paths):
+    if isinstance(paths, str):
+        paths = [paths]
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(path)) if glob.has_magic(path) else [path])
+    return files
+
+# files are parsed once and then read from their sequence_codec cache
+def iter_chunks(paths, chunk_rows=CHUNK_ROWS):
+    for path in expand_paths(paths):
+        encoded = sequence_codec.load_sequences(path, "sequence")
+        for start in range(0, len(encoded), chunk_rows):
+            yield encoded[start:start + chunk_rows]
+
+# map-reduce W/L over every chunk of every input file; chunks are merged as they finish
+def count_files(paths, chunk_rows=CHUNK_ROWS, num_workers=NUM_WORKERS):
+    chunks = iter_chunks(paths, chunk_rows)
+    if num_workers <= 1:
+        return merge_counts([count_chunk(chunk) for chunk in chunks])
+
+    total = merge_counts([])
+    with ProcessPoolExecutor(num_workers) as pool:
+        pending = set()
+        for chunk in chunks:
+            pending.add(pool.submit(count_chunk, chunk))
+            if len(pending) >= 2 * num_workers:  # bound the chunks held in memory
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total = merge_counts([total] + [f.result() for f in done])
+        total = merge_counts([total] + [f.result() for f in pending])
+    return total
+
+# R_ij = W_ij / L_ij, with W and L as fractions of won / lost episodes
+def ratio_table(X, W, L, total_won, total_lost):
+    m = len(X)
+    records = []
+    for i in range(m):
+        for j in range(m):
+            if i == j:
+                continue
+            w_ij = W[i, j] / total_won if total_won else 0
+            l_ij = L[i, j] / total_lost if total_lost else 0
+            if l_ij == 0:
+                R = float("inf") if w_ij > 0 else 0
+            else:
+                R = w_ij / l_ij
+
+            records.append({
+                "i": X[i],
+                "j": X[j],
+                "W_ij": round(w_ij, 4),
+                "L_ij": round(l_ij, 4),
+                "R_ij": R
+            })
+    return pd.DataFrame(records).sort_values(by="R_ij", ascending=False)
+
+
+if __name__ == "__main__":
+    X, W, L, total_won, total_lost = count_files(CSV_FILES)
+    df_result = ratio_table(X, W, L, total_won, total_lost)
+    df_result.to_csv(OUTPUT_FILE, index=False)
+
+    print(f"Saved R_ij table to: {OUTPUT_FILE}")
+    print(df_result.head(10))
@@ -1,8 +1,9 @@
-import ast
 import pandas as pd
 import os
 import numpy as np
 import json
+from scipy import sparse
+from sequence_codec import load_sequences, event_index
 
 # def parse_sequence(seq_str):
 #     I = {'e1', 'e2'}
@@ -21,90 +22,172 @@ import json
 #             sequence.append(term)
 #     return sequence
 
-def method1(c_list):
-    """Generate M_c and P^c based on the given sequence c."""
-    I_order = ['e1', 'e2', 'e5', 'e6', 'e11']
-    extended_order = I_order
-    m = len(extended_order) #changed form i_order to extended order
-    processed = []
-    n = 0
-    
-    for c in c_list:
-        P = {e: set() for e in extended_order} #changed form i_order to extended order
+I_order = ['e1', 'e2', 'e5', 'e6', 'e11']
+
+
+def occurrences(c_list, order):
+    """(sequence, event, 1-based term position) of every event of order found, as three lists."""
+    index = {e: k for k, e in enumerate(order)}
+    rows, cols, pos = [], [], []
+    for r, c in enumerate(c_list):
         for term_idx, term in enumerate(c, 1):
-            elements = list(term) if isinstance(term, tuple) else [term]
+            elements = term if isinstance(term, tuple) else (term,)
             for e in elements:
-                if e in P:
-                    P[e].add(term_idx)
-        
-        M_c = [[0]*m for _ in range(m)]
-        
-        for i in range(m):
-            for j in range(m):
-                if i == j:
-                    continue
-                P_i = P[extended_order[i]] #changed
-                P_j = P[extended_order[j]] #changed
-                
-                if P_i and P_j and max(P_i) < min(P_j):
-                    M_c[i][j] = 1
-                
-        processed.append((M_c, P))
-        M_c_array = np.array(M_c)
-        if np.any(M_c_array):
-            print(M_c_array)
-            n = n+1
-            
-    print(n)
-    return processed
-
-
-def method2ForProcessed(processed):
-    I_order = ['e1', 'e2', 'e5', 'e6', 'e11']
-    extended_order = I_order
-    m = len(extended_order) #changed from I_order
-    M = [[0]*m for _ in range(m)]
-    
-    for i in range(m):
-        for j in range(m):
-            if i == j:
-                continue
-            ei = extended_order[i]
-            ej = extended_order[j]
-       
-            condition_a = True
-            for M_c_k, P_k in processed:
-                if P_k[ei] and P_k[ej]:  # Only check if both are nonempty
-                    if M_c_k[i][j] != 1:
-                        condition_a = False
-                        break  # No need to check further if one fails
-                
-        
-
-            
-            condition_b = any(
-                P_k[ei] and P_k[ej] and max(P_k[ei]) < min(P_k[ej])
-                for _, P_k in processed
-            )
-            
-            if condition_a and condition_b:
-                M[i][j] = 1
-    
-    return M
+                k = index.get(e)
+                if k is not None:
+                    rows.append(r)
+                    cols.append(k)
+                    pos.append(term_idx)
+    return rows, cols, pos
+
+
+def occurrence_arrays(c_list, order=I_order):
+    """
+    First and last (1-based) position of each event of order in every
+    sequence, as (n, m) int arrays; 0 where the event does not occur.
+    """
+    rows, cols, pos = occurrences(c_list, order)
+
+    n, m = len(c_list), len(order)
+    first = np.full((n, m), np.iinfo(np.int32).max, dtype=np.int32)
+    last = np.zeros((n, m), dtype=np.int32)
+    np.minimum.at(first, (rows, cols), pos)
+    np.maximum.at(last, (rows, cols), pos)
+    first[last == 0] = 0
+    return first, last
+
+
+def dependency_tensor(first, last):
+    """All M_c at once: M_c[k, i, j] = both occur in c_k and max(P_i) < min(P_j)."""
+    present = last > 0
+    return present[:, :, None] & present[:, None, :] & (last[:, :, None] < first[:, None, :])
+
+
+def consensus(M_c, first, last):
+    """
+    M[i, j] = 1 when every sequence holding both e_i and e_j orders them
+    i before j (condition a) and at least one does (condition b).
+    """
+    present = last > 0
+    both = present[:, :, None] & present[:, None, :]
+    condition_a = ~np.any(both & ~M_c, axis=0)
+    condition_b = np.any(M_c, axis=0)
+    return (condition_a & condition_b).astype(int)
+
+
+def event_alphabet(c_list):
+    """Every event found in the sequences, in e-number order (e1, e2, ..., e10, ...)."""
+    events = set()
+    for c in c_list:
+        for term in c:
+            events.update(term if isinstance(term, tuple) else (term,))
+    return sorted(events, key=lambda e: (event_index(e), e))
+
+
+def occurrence_matrices(c_list, order=None):
+    """
+    Sparse occurrence_arrays for large alphabets: first and last positions
+    as (n, m) CSR matrices with the same structure, one stored entry per
+    event that occurs. order=None uses event_alphabet(c_list).
+    """
+    order = event_alphabet(c_list) if order is None else list(order)
+    rows, cols, pos = occurrences(c_list, order)
+
+    n, m = len(c_list), len(order)
+    keys = np.asarray(rows, dtype=np.int64) * m + np.asarray(cols, dtype=np.int64)
+    keys, inverse = np.unique(keys, return_inverse=True)
+    first = np.full(len(keys), np.iinfo(np.int32).max, dtype=np.int32)
+    last = np.zeros(len(keys), dtype=np.int32)
+    np.minimum.at(first, inverse, pos)
+    np.maximum.at(last, inverse, pos)
+
+    indptr = np.searchsorted(keys // max(m, 1), np.arange(n + 1))
+    indices = (keys % max(m, 1)).astype(np.int32)
+    return (order,
+            sparse.csr_matrix((first, indices, indptr), shape=(n, m)),
+            sparse.csr_matrix((last, indices.copy(), indptr.copy()), shape=(n, m)))
+
+
+def sparse_dependency_tensor(first, last):
+    """
+    dependency_tensor on the CSR occurrences: an (n, m*m) boolean CSR whose
+    row k is M_c of sequence k flattened, holding only its ordered pairs.
+    Pairs are built within each row, so the cost is sum(q_k^2) over the
+    q_k distinct events of each sequence rather than n * m^2.
+    """
+    n, m = first.shape
+    q = np.diff(first.indptr).astype(np.int64)
+    counts = np.repeat(q, q)                        # partners of each stored entry
+    left = np.repeat(np.arange(first.nnz), counts)
+    offsets = np.arange(len(left)) - np.repeat(np.cumsum(counts) - counts, counts)
+    right = np.repeat(first.indptr[:-1].astype(np.int64), q * q) + offsets
+    keep = last.data[left] < first.data[right]
+    left, right = left[keep], right[keep]
+
+    seq = np.repeat(np.arange(n), q)[left]
+    pair = first.indices[left].astype(np.int64) * m + first.indices[right]
+    return sparse.csr_matrix((np.ones(len(seq), dtype=bool), (seq, pair)), shape=(n, m * m))
+
+
+def sparse_consensus(M_c, first):
+    """consensus for the sparse engine, as an (m, m) CSR of 0/1."""
+    m = first.shape[1]
+    present = first.astype(bool).astype(np.int64)
+    both = (present.T @ present).tocsr()                            # sequences holding e_i and e_j
+    ordered = np.asarray(M_c.astype(np.int64).sum(axis=0)).ravel()  # ... with e_i before e_j
+    pairs = np.flatnonzero(ordered)
+    i, j = pairs // m, pairs % m
+    agree = ordered[pairs] == np.asarray(both[i, j]).ravel()
+    return sparse.csr_matrix((np.ones(agree.sum(), dtype=int), (i[agree], j[agree])), shape=(m, m))
+
+
+def positions(c, order=I_order):
+    P = {e: set() for e in order}
+    for term_idx, term in enumerate(c, 1):
+        elements = list(term) if isinstance(term, tuple) else [term]
+        for e in elements:
+            if e in P:
+                P[e].add(term_idx)
+    return P
+
+
+def method1(c_list, order=I_order):
+    """Generate M_c and P^c based on the given sequence c."""
+    first, last = occurrence_arrays(c_list, order)
+    M_c = dependency_tensor(first, last).astype(int)
+    selected = M_c.any(axis=(1, 2))
+    for M_c_array in M_c[selected]:
+        print(M_c_array)
+    print(int(selected.sum()))
+    return [(M_c[k].tolist(), positions(c, order)) for k, c in enumerate(c_list)]
+
+
+def method2ForProcessed(processed, order=I_order):
+    m = len(order)
+    n = len(processed)
+    first = np.zeros((n, m), dtype=np.int32)
+    last = np.zeros((n, m), dtype=np.int32)
+    for k, (_, P_k) in enumerate(processed):
+        for i, e in enumerate(order):
+            if P_k[e]:
+                first[k, i], last[k, i] = min(P_k[e]), max(P_k[e])
+    M_c = np.array([M_c_k for M_c_k, _ in processed], dtype=bool).reshape(n, m, m)
+    return consensus(M_c, first, last).tolist()
 
 if __name__ == '__main__':
     script_dir = os.path.dirname(os.path.abspath(__file__))
     csv_file_path = os.path.join(script_dir, "corrupted_medium_10pct.csv")
-    df = pd.read_csv(csv_file_path)
-    
-    c_list = [ast.literal_eval(symptom_set) for symptom_set in df["corrupted_sequence"]]
+    c_list = load_sequences(csv_file_path, "corrupted_sequence").decode()
     c_list2 = [
         ['e1', 'e5','e4'], 
         ['e1', 'e2','e4'],  # e4 before e5
 
     ]
-    processed = method1(c_list)
-    M = method2ForProcessed(processed)
+    order = I_order  # None: every event found in the data
+    order, first, last = occurrence_matrices(c_list, order)
+    m = len(order)
+    M_c = sparse_dependency_tensor(first, last)
+    M = sparse_consensus(M_c, first).toarray().tolist()
     
     print("Final Matrix M:")
     for row in M:
@@ -113,25 +196,23 @@ if __name__ == '__main__':
 
     
     selected_Mc_and_P = []
-    for M_c, P in processed:
-        M_c_np = np.array(M_c)
-
-        if np.any(M_c_np):  # selection criteria
-            # Add 1s on the diagonal
-            for i in range(len(M_c)):
-                M_c[i][i] = 1
+    for k in np.flatnonzero(M_c.getnnz(axis=1)):  # selection criteria
+        # Add 1s on the diagonal
+        M_c_k = M_c[k].toarray().reshape(m, m).astype(int)
+        np.fill_diagonal(M_c_k, 1)
 
-            # Convert P sets to sorted lists for JSON
-            P_json = {k: sorted(list(P[k])) for k in P}
+        # Convert P sets to sorted lists for JSON
+        P = positions(c_list[k], order)
+        P_json = {e: sorted(list(P[e])) for e in P}
 
-            selected_Mc_and_P.append({
-                "M_c": M_c,
-                "P": P_json
-            })
+        selected_Mc_and_P.append({
+            "M_c": M_c_k.tolist(),
+            "P": P_json
+        })
 
     print(f"Saving {len(selected_Mc_and_P)} matrices with P")
 
-    out_path = os.path.join(script_dir, "M_c_matrices_diagonal_1 ('e1', 'e2', 'e5', 'e6', 'e11') corrupted10%.json")
+    out_path = os.path.join(script_dir, f"M_c_matrices_diagonal_1 {tuple(order)} corrupted10%.json")
     with open(out_path, "w") as f:
         json.dump(selected_Mc_and_P, f, indent=2)
 
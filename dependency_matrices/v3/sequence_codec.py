@@ -0,0 +1,156 @@
+"""
+Shared codec for the episode sequence strings in the preprocessing CSVs,
+e.g. "['e2', 'e1', 'e9']" (sequence column) or '["e2", "e1"]' (the JSON
+columns written by corruptData).
+
+parse_sequence() replaces ast.literal_eval on the hot paths: flat lists of
+quoted codes are split with one regex, anything else (tuples of
+simultaneous events) still goes through literal_eval.
+
+load_sequences() parses a whole column once into small ints and keeps the
+result as a sidecar <csv>.<column>.npz next to the file, keyed by the
+file's content hash, so later runs skip parsing entirely.
+"""
+import ast
+import hashlib
+import os
+import re
+import numpy as np
+import pandas as pd
+
+VERSION = 1  # bump when the cached layout changes
+
+TOKEN = re.compile(r"""['"]([^'"]*)['"]""")
+FLAT = re.compile(r"""^\s*\[\s*(?:(?:'[^']*'|"[^"]*")\s*(?:,\s*(?:'[^']*'|"[^"]*")\s*)*,?\s*)?\]\s*$""")
+
+
+def parse_sequence(seq_str):
+    if isinstance(seq_str, str) and FLAT.match(seq_str):
+        return TOKEN.findall(seq_str)
+    try:
+        parsed = ast.literal_eval(seq_str)
+        return parsed if isinstance(parsed, list) else []
+    except:
+        return []
+
+
+def event_index(e):
+    digits = ''.join(ch for ch in e if ch.isdigit())
+    return int(digits) if digits else -1
+
+
+def file_hash(path, block=1 << 20):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class EncodedSequences:
+    """
+    Sequences as flat int arrays: codes[term_ptr[t]:term_ptr[t+1]] are the
+    events of term t (one, or several for a tuple term), and
+    term_ptr[seq_ptr[k]:seq_ptr[k+1]] the terms of sequence k. events maps
+    a code back to its e-code, in e-number order.
+    """
+
+    def __init__(self, events, codes, term_ptr, seq_ptr):
+        self.events = list(events)
+        self.codes = codes
+        self.term_ptr = term_ptr
+        self.seq_ptr = seq_ptr
+
+    @classmethod
+    def encode(cls, sequences):
+        """Encode any iterable of parsed sequences in one pass."""
+        index = {}  # codes in order of appearance, renumbered to e-number order at the end
+        codes, term_lens, seq_lens = [], [], []
+        for seq in sequences:
+            seq_lens.append(len(seq))
+            for term in seq:
+                elements = term if isinstance(term, tuple) else (term,)
+                term_lens.append(len(elements))
+                codes.extend(index.setdefault(e, len(index)) for e in elements)
+        events = sorted(index, key=lambda e: (event_index(e), e))
+        remap = np.empty(len(index), dtype=np.int32)
+        remap[[index[e] for e in events]] = np.arange(len(events), dtype=np.int32)
+        return cls(events,
+                   remap[np.asarray(codes, dtype=np.int64)] if codes else np.zeros(0, dtype=np.int32),
+                   np.concatenate([[0], np.cumsum(term_lens, dtype=np.int64)]),
+                   np.concatenate([[0], np.cumsum(seq_lens, dtype=np.int64)]))
+
+    def __len__(self):
+        return len(self.seq_ptr) - 1
+
+    def __getitem__(self, rows):
+        """A slice of rows, sharing the event alphabet (and the code array)."""
+        start, stop, _ = rows.indices(len(self))
+        seq_ptr = self.seq_ptr[start:stop + 1] - self.seq_ptr[start]
+        t0, t1 = self.seq_ptr[start], self.seq_ptr[stop]
+        term_ptr = self.term_ptr[t0:t1 + 1]
+        return EncodedSequences(self.events, self.codes[term_ptr[0]:term_ptr[-1]],
+                                term_ptr - term_ptr[0], seq_ptr)
+
+    def decode(self):
+        """Back to lists of e-codes (tuples for multi-event terms)."""
+        sequences = []
+        for k in range(len(self)):
+            seq = []
+            for t in range(self.seq_ptr[k], self.seq_ptr[k + 1]):
+                elements = tuple(self.events[c] for c in self.codes[self.term_ptr[t]:self.term_ptr[t + 1]])
+                seq.append(elements[0] if len(elements) == 1 else elements)
+            sequences.append(seq)
+        return sequences
+
+    def _entry_rows(self):
+        # sequence and within-sequence term index of every code
+        term_of_code = np.repeat(np.arange(len(self.term_ptr) - 1), np.diff(self.term_ptr))
+        seq_of_term = np.repeat(np.arange(len(self)), np.diff(self.seq_ptr))
+        seq = seq_of_term[term_of_code]
+        return seq, term_of_code - self.seq_ptr[seq]
+
+    def first_positions(self):
+        """(n, len(events)) index of the first term holding each event, -1 if absent."""
+        n, m = len(self), len(self.events)
+        first = np.full((n, m), -1, dtype=np.int32)
+        seq, pos = self._entry_rows()
+        keys, at = np.unique(seq.astype(np.int64) * m + self.codes, return_index=True)
+        first[keys // max(m, 1), keys % max(m, 1)] = pos[at]  # codes are in term order
+        return first
+
+    def last_term_contains(self, events):
+        """Bool per sequence: its last term holds one of events."""
+        wanted = np.isin(self.codes, [self.events.index(e) for e in events if e in self.events])
+        term_of_code = np.repeat(np.arange(len(self.term_ptr) - 1), np.diff(self.term_ptr))
+        term_hit = np.bincount(term_of_code[wanted], minlength=len(self.term_ptr) - 1) > 0
+        result = np.zeros(len(self), dtype=bool)
+        has_terms = np.diff(self.seq_ptr) > 0
+        result[has_terms] = term_hit[self.seq_ptr[1:][has_terms] - 1]
+        return result
+
+
+def cache_path(path, column):
+    return f"{path}.{column}.npz"
+
+
+def load_sequences(path, column="sequence", cache=True, chunk_rows=100_000):
+    """Encoded column of a CSV, from the sidecar cache when the file is unchanged."""
+    digest = file_hash(path)
+    sidecar = cache_path(path, column)
+    if cache and os.path.exists(sidecar):
+        with np.load(sidecar) as data:
+            if int(data["version"]) == VERSION and str(data["hash"]) == digest:
+                return EncodedSequences(data["events"].tolist(), data["codes"], data["term_ptr"], data["seq_ptr"])
+
+    encoded = EncodedSequences.encode(
+        parse_sequence(s)
+        for df in pd.read_csv(path, usecols=[column], chunksize=chunk_rows)
+        for s in df[column])
+    if cache:
+        tmp = sidecar + ".tmp"
+        with open(tmp, "wb") as f:
+            np.savez(f, version=VERSION, hash=digest, events=np.array(encoded.events, dtype=str),
+                     codes=encoded.codes, term_ptr=encoded.term_ptr, seq_ptr=encoded.seq_ptr)
+        os.replace(tmp, sidecar)
+    return encoded
@@ -0,0 +1,651 @@
+import time
+import numpy as np
+from gym import spaces
+from stable_baselines3.common.vec_env import VecEnv
+import sim_core
+from sim_core import GameCore, KEY, EXPLOSIVE, DOOR, ROCK, COIN, INTERACTION_DISTANCE, PLAYER_SIZE
+from distance_field import DistanceField, UNREACHABLE
+from episode_log import open_episode_log
+
+MAX_EPISODE_STEPS = 20000
+MOVES = np.array([(0, -1), (0, 1), (-1, 0), (1, 0)])  # up, down, left, right
+INF = float("inf")
+
+
+class BatchProjectGameEnv(VecEnv):
+    """
+    N independent ProjectGameEnv games stepped together as NumPy arrays.
+
+    Every game shares the map and STATIC_LAYOUT, so per-game state is just
+    player position, object masks (on map / door open), an ordered
+    inventory and the shaping bookkeeping, one row per game. Movement,
+    pickup, interact, select and the shaping rewards of ProjectGameEnv.step
+    are applied to all rows at once; Python loops only run over the handful
+    of objects in the layout, or over the games that logged an event.
+
+    Rocks and doors are the only things that change the map, so every
+    combination of opened obstacles gets its walk grid and the distance
+    fields to every object precomputed once, and a game's shaping distances
+    are a single fancy-index into those tables.
+
+    Implements the stable-baselines3 VecEnv interface: finished games are
+    reset automatically and their last observation is returned in
+    info["terminal_observation"]. Pass record_events=False to skip building
+    the per-step player_data event dicts when only throughput matters, and
+    log_path to stream finished episodes to disk (JSON Lines or a .traj
+    trajectory store) instead of all_episode_logs.
+    """
+
+    def __init__(self, num_envs, tmx_path=sim_core.TMX_PATH, record_events=True, log_path=None):
+        super().__init__(
+            num_envs,
+            spaces.Box(low=0, high=1, shape=(7,), dtype=np.float32),
+            spaces.Discrete(10),  # 0-3 move, 4=pickup, 5=interact, 6-9=select item 0-3
+        )
+        self.record_events = record_events
+        self.tmx_data = sim_core.load_map(tmx_path)
+        core = self.core = GameCore(self.tmx_data)  # static layout only, never stepped
+        self.tilewidth = core.tilewidth
+        self.tileheight = core.tileheight
+
+        self.kind = core.kind.astype(np.int64)
+        self.color = np.array(core.color)
+        self.name = np.array(core.name)
+        self.weight = np.array(core.weight)
+        self.rects = core.rects
+        self.n_objects = n = len(self.kind)
+        self.is_key = self.kind == KEY
+        self.is_explosive = self.kind == EXPLOSIVE
+        self.is_door = self.kind == DOOR
+        self.is_rock = self.kind == ROCK
+        self.is_coin = self.kind == COIN
+        self.is_blue_door = self.is_door & (self.color == "blue")
+
+        # every combination of destroyed rocks / opened doors is one variant
+        self.obstacles = core.objects(ROCK, alive_only=False) + core.objects(DOOR, alive_only=False)
+        self.obstacle_bit = np.zeros(n, dtype=np.int64)
+        for b, i in enumerate(self.obstacles):
+            self.obstacle_bit[i] = 1 << b
+        self._build_tables()
+
+        N = num_envs
+        self.pos = np.zeros((N, 2), dtype=np.int64)             # player rect top-left
+        self.last_position = np.zeros((N, 2))
+        self.alive = np.ones((N, n), dtype=bool)                 # on the map / standing / uncollected
+        self.door_open = np.zeros((N, n), dtype=bool)
+        self.variant = np.zeros(N, dtype=np.int64)                # bitmask of opened obstacles
+        self.inventory = np.full((N, n), -1, dtype=np.int64)     # object indices in pickup order
+        self.inventory_size = np.zeros(N, dtype=np.int64)
+        self.current_weight = np.zeros(N, dtype=np.int64)
+        self.max_weight = 9999
+        self.selected_item = np.full(N, -1, dtype=np.int64)
+        self.steps = np.zeros(N, dtype=np.int64)
+        self.episode_distance = np.zeros(N, dtype=np.int64)
+        self.visited_tiles = np.zeros((N, self.tmx_data.height, self.tmx_data.width), dtype=bool)
+        self.proximity_seen = np.zeros((N, n), dtype=bool)
+        self.coin_win = np.zeros(N, dtype=bool)
+        self.game_won = np.zeros(N, dtype=bool)
+        self.did_meaningful_action = np.zeros(N, dtype=bool)
+        self.episode_start_time = np.zeros(N)
+        # last shaping distances, NaN meaning "not measured yet"
+        self.last_key_dist = np.full(N, np.nan)
+        self.last_door_dist = np.full(N, np.nan)
+        self.last_explosive_dist = np.full(N, np.nan)
+        self.last_coin_dist = np.full(N, np.nan)
+        self.last_rock1_dist = np.full(N, np.nan)
+        self.last_rock2_dist = np.full(N, np.nan)
+
+        # carried across episodes, like the attributes ProjectGameEnv never resets
+        self.prev_tile = np.zeros((N, 2), dtype=np.int64)
+        self.has_prev_tile = np.zeros(N, dtype=bool)
+        self.memorized_win = np.zeros(N, dtype=bool)
+        self.learned_object_memory = np.zeros(N, dtype=bool)
+        self.known = np.zeros((N, n), dtype=bool)  # known_{key,explosive,door}_locs as masks
+        self.hard_targets = np.full((N, 5), -1, dtype=np.int64)
+        self.hard_target_head = np.zeros(N, dtype=np.int64)
+        self.hard_target_count = np.zeros(N, dtype=np.int64)
+
+        self.player_data = [[] for _ in range(N)]
+        self.log_path = log_path
+        self.all_episode_logs = open_episode_log(log_path) if log_path else []
+        self._actions = np.zeros(N, dtype=np.int64)
+
+    def _build_tables(self):
+        core = self.core
+        n = self.n_objects
+        distances = DistanceField(self.tmx_data, obstacles=[core.centers[i] for i in self.obstacles])
+        self.map_width, self.map_height = distances.width, distances.height
+        self.unscaled_tile = (distances.tile_width, distances.tile_height)
+        self.goal_tiles = np.array([distances.tile_of(c) for c in core.centers]).reshape(n, 2)
+
+        n_variants = 1 << len(self.obstacles)
+        self.fields = np.full((n_variants, n, self.map_height + 2, self.map_width + 2),
+                              UNREACHABLE, dtype=np.int16)
+        self.walkable = np.zeros((n_variants,) + core.walk_grid.floor.shape, dtype=bool)
+        for v in range(n_variants):
+            distances.restore()
+            core.walk_grid.restore()
+            for b, i in enumerate(self.obstacles):
+                if v >> b & 1:
+                    distances.open_obstacle(core.centers[i])
+                    if core.kind[i] == ROCK:
+                        core.walk_grid.open(core.rock_tiles[i])
+            for i, goal in enumerate(core.centers):
+                field = distances.field(goal)
+                if field is not None:
+                    self.fields[v, i] = field
+            self.walkable[v] = core.walk_grid.passable
+        core.walk_grid.restore()
+
+    # --- VecEnv interface ----------------------------------------------
+
+    def reset(self):
+        self._reset_envs(np.arange(self.num_envs))
+        return self._get_obs()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        reward, done, infos = self._step(self._actions)
+        obs = self._get_obs()
+        finished = np.flatnonzero(done)
+        if len(finished):
+            for i in finished:
+                infos[i]["terminal_observation"] = obs[i].copy()
+            self._reset_envs(finished)
+            obs[finished] = self._get_obs()[finished]
+        return obs, reward, done, infos
+
+    def close(self):
+        if self.log_path:
+            self.all_episode_logs.close()
+
+    def seed(self, seed=None):
+        return [None] * self.num_envs  # the games are deterministic
+
+    def get_attr(self, attr_name, indices=None):
+        value = getattr(self, attr_name)
+        return [value[i] if self._is_batched(value) else value for i in self._get_indices(indices)]
+
+    def set_attr(self, attr_name, value, indices=None):
+        current = getattr(self, attr_name, None)
+        if self._is_batched(current):
+            for i in self._get_indices(indices):
+                current[i] = value
+        else:
+            setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        method = getattr(self, method_name)
+        return [method(*method_args, **method_kwargs) for _ in self._get_indices(indices)]
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False for _ in self._get_indices(indices)]
+
+    def _is_batched(self, value):
+        return isinstance(value, (np.ndarray, list)) and len(value) == self.num_envs
+
+    # --- game logic ----------------------------------------------------
+
+    def _reset_envs(self, idx):
+        core = self.core
+        x, y = core.player_spawn
+        self.pos[idx] = (sim_core._px(x), sim_core._px(y))
+        self.last_position[idx] = (x, y)
+        self.alive[idx] = True
+        self.door_open[idx] = False
+        self.variant[idx] = 0
+        self.inventory[idx] = -1
+        self.inventory_size[idx] = 0
+        self.current_weight[idx] = 0
+        self.selected_item[idx] = -1
+        self.steps[idx] = 0
+        self.episode_distance[idx] = 0
+        self.visited_tiles[idx] = False
+        self.proximity_seen[idx] = False
+        self.coin_win[idx] = False
+        self.game_won[idx] = False
+        self.did_meaningful_action[idx] = False
+        self.episode_start_time[idx] = time.time()
+        for last in (self.last_key_dist, self.last_door_dist, self.last_explosive_dist,
+                     self.last_coin_dist, self.last_rock1_dist, self.last_rock2_dist):
+            last[idx] = np.nan
+        for i in idx:
+            self.player_data[i] = []
+
+        # replay of a memorized win: explosive, rock1, rock2, key, door
+        targets = np.stack([
+            self._last_known(EXPLOSIVE, "red"),
+            np.full(self.num_envs, self._last_named(ROCK, "rock1")),
+            np.full(self.num_envs, self._last_named(ROCK, "rock2")),
+            self._last_known(KEY, "blue"),
+            self._last_known(DOOR, "blue"),
+        ], axis=1)[idx]
+        valid = targets >= 0
+        order = np.argsort(~valid, axis=1, kind="stable")
+        self.hard_targets[idx] = np.take_along_axis(targets, order, axis=1)
+        self.hard_target_head[idx] = 0
+        self.hard_target_count[idx] = np.where(self.memorized_win[idx], valid.sum(axis=1), 0)
+
+    def _last_known(self, kind, color):
+        """Per game, the object a known_*_locs.get(color) lookup resolves to, or -1."""
+        found = np.full(self.num_envs, -1, dtype=np.int64)
+        for i in np.flatnonzero((self.kind == kind) & (self.color == color)):
+            found[self.known[:, i]] = i
+        return found
+
+    def _last_named(self, kind, name):
+        matches = np.flatnonzero((self.kind == kind) & (self.name == name))
+        return matches[-1] if len(matches) else -1
+
+    def _near(self, distance):
+        """(N, objects) mask of object rects inflated by distance touching the player."""
+        px, py = self.pos[:, :1], self.pos[:, 1:]
+        r = self.rects
+        x, y = r[:, 0] - distance // 2, r[:, 1] - distance // 2
+        w, h = r[:, 2] + distance, r[:, 3] + distance
+        return (px < x + w) & (x < px + PLAYER_SIZE) & (py < y + h) & (y < py + PLAYER_SIZE)
+
+    def _distances(self):
+        """(N, objects) shaping path distance from the player centre to every object."""
+        n = self.n_objects
+        cx = self.pos[:, 0] + PLAYER_SIZE // 2
+        cy = self.pos[:, 1] + PLAYER_SIZE // 2
+        sx = cx // self.unscaled_tile[0]
+        sy = cy // self.unscaled_tile[1]
+        inside = (sx >= -1) & (sx <= self.map_width) & (sy >= -1) & (sy <= self.map_height)
+        d = self.fields[
+            self.variant[:, None],
+            np.arange(n)[None, :],
+            np.clip(sy + 1, 0, self.map_height + 1)[:, None],
+            np.clip(sx + 1, 0, self.map_width + 1)[:, None],
+        ].astype(np.float64)
+        d[(d >= UNREACHABLE) | (d > 300) | ~inside[:, None]] = INF
+        same = (sx[:, None] == self.goal_tiles[:, 0]) & (sy[:, None] == self.goal_tiles[:, 1])
+        d[same] = 0
+        return d
+
+    def _inventory_mask(self, mask):
+        """Per inventory slot, whether the held object satisfies the object mask."""
+        held = self.inventory >= 0
+        return held & mask[np.where(held, self.inventory, 0)]
+
+    def _pick_up(self, rows, i):
+        rows = rows[self.current_weight[rows] + self.weight[i] <= self.max_weight]
+        self.inventory[rows, self.inventory_size[rows]] = i
+        self.inventory_size[rows] += 1
+        self.current_weight[rows] += self.weight[i]
+
+    def _drop(self, rows, items):
+        keep = self.inventory[rows] != items[:, None]
+        order = np.argsort(~keep, axis=1, kind="stable")
+        inventory = np.take_along_axis(self.inventory[rows], order, axis=1)
+        inventory[~np.take_along_axis(keep, order, axis=1)] = -1
+        self.inventory[rows] = inventory
+        self.inventory_size[rows] = (inventory >= 0).sum(axis=1)
+
+    def _describe(self, i):
+        return (str(self.name[i]), str(self.color[i]))
+
+    def _topleft(self, row):
+        return (int(self.pos[row, 0]), int(self.pos[row, 1]))
+
+    def _log(self, rows, make_event):
+        if self.record_events:
+            rows = np.asarray(rows)
+            for row in np.flatnonzero(rows) if rows.dtype == bool else rows:
+                self.player_data[row].append(make_event(row))
+
+    def _locs(self, mask, key):
+        return {str(key[i]): self.core.centers[i] for i in np.flatnonzero(mask)}
+
+    def _step(self, actions):
+        N = self.num_envs
+        rows = np.arange(N)
+        reward = np.zeros(N)
+        infos = [{} for _ in range(N)]
+        kind, color = self.kind, self.color
+
+        # 1) Movement
+        moving = np.flatnonzero(actions < 4)
+        if len(moving):
+            delta = MOVES[actions[moving]]
+            tile_x = self.pos[moving, 0] // self.tilewidth + delta[:, 0]
+            tile_y = self.pos[moving, 1] // self.tileheight + delta[:, 1]
+            ok = (tile_x >= 0) & (tile_x < self.walkable.shape[2]) & (tile_y >= 0) & (tile_y < self.walkable.shape[1])
+            ok[ok] = self.walkable[self.variant[moving[ok]], tile_y[ok], tile_x[ok]]
+            moving, tile_x, tile_y = moving[ok], tile_x[ok], tile_y[ok]
+            self.pos[moving, 0] = tile_x * self.tilewidth
+            self.pos[moving, 1] = tile_y * self.tileheight
+            new_tile = (tile_x != self.last_position[moving, 0]) | (tile_y != self.last_position[moving, 1])
+            moving = moving[new_tile]
+            self.last_position[moving] = self.pos[moving] // (self.tilewidth, self.tileheight)
+            self._log(moving, lambda i: {"event": "move",
+                                         "tile": (int(self.last_position[i, 0]), int(self.last_position[i, 1])),
+                                         "step": int(self.steps[i])})
+
+        # 2) Interact: auto-select a matching item, then try the first door, else the first rock
+        interacting = actions == 5
+        near = self._near(INTERACTION_DISTANCE) & self.alive
+        auto = interacting & (self.selected_item < 0)
+        if auto.any():
+            for i in np.flatnonzero(self.is_rock).tolist() + np.flatnonzero(self.is_door).tolist():
+                wanted = (kind == (EXPLOSIVE if kind[i] == ROCK else KEY)) & (color == color[i])
+                slots = self._inventory_mask(wanted)
+                pick = auto & near[:, i] & slots.any(axis=1)
+                self.selected_item[pick] = self.inventory[pick, slots[pick].argmax(axis=1)]
+
+        near_door = near & self.is_door
+        near_rock = near & self.is_rock
+        target = np.where(near_door.any(axis=1), near_door.argmax(axis=1),
+                          np.where(near_rock.any(axis=1), near_rock.argmax(axis=1), -1))
+        item = self.selected_item
+        tried = interacting & (item >= 0) & (target >= 0)
+        needed = np.where(kind[target] == DOOR, KEY, EXPLOSIVE)
+        success = tried & (kind[item] == needed) & (color[item] == color[target])
+        opened = success & (kind[target] == DOOR)
+        blasted = success & (kind[target] == ROCK)
+
+        self._log(tried & ~success & (kind[target] == DOOR), lambda i: {
+            "event": "failed_interaction",
+            "reason": "wrong_item_on_door",
+            "door_color": str(color[target[i]]),
+            "item": self._describe(item[i]),
+            "position": self._topleft(i),
+            "step": int(self.steps[i])
+        })
+        self._log(tried & ~success & (kind[target] == ROCK), lambda i: {
+            "event": "failed_interaction",
+            "reason": "wrong_item_on_rock",
+            "type": str(self.name[target[i]]),
+            "rock_color": str(color[target[i]]),
+            "item": self._describe(item[i]),
+            "position": self._topleft(i),
+            "step": int(self.steps[i])
+        })
+
+        used = np.flatnonzero(success)
+        self.door_open[rows[opened], target[opened]] = True
+        self.alive[rows[blasted], target[blasted]] = False
+        self.variant[used] |= self.obstacle_bit[target[used]]
+        self._drop(used, item[used])
+        self._log(used, lambda i: {
+            "event": "interact",
+            "type": "door" if opened[i] else str(self.name[target[i]]),
+            "color": str(color[target[i]]),
+            "item": self._describe(item[i]),
+            "position": self._topleft(i),
+            "step": int(self.steps[i])
+        })
+        door_win = opened & self.is_blue_door[target]
+        self.game_won |= door_win
+        self._log(door_win, lambda i: {
+            "event": "game_won",
+            "steps_taken": int(self.steps[i]),
+            "duration_seconds": round(time.time() - self.episode_start_time[i], 3),
+        })
+        self._log(used, lambda i: {
+            "event": "successful_interaction",
+            "type": "key" if opened[i] else "explosive",
+            "step": int(self.steps[i])
+        })
+        self.selected_item[used] = -1
+        self.did_meaningful_action |= success
+        reward += 2.0 * success
+
+        failed = interacting & ~success
+        near_block = (near & (self.is_rock | self.is_door)).any(axis=1)
+        reward -= np.where(near_block & (self.selected_item >= 0), 1.0, 0.3) * failed
+
+        # every distance below is measured after this step's moves and blasts
+        dist = self._distances()
+
+        def first_alive(mask):
+            alive = self.alive & mask
+            exists = alive.any(axis=1)
+            return exists, np.where(exists, dist[rows, alive.argmax(axis=1)], INF)
+
+        # reward coin-seeking right after rock2 is cleared
+        after_rock2 = blasted & (self.name[target] == "rock2")
+        if after_rock2.any():
+            has_coin, d_coin = first_alive(self.is_coin)
+            after_rock2 &= has_coin
+            closer = after_rock2 & (d_coin < self.last_coin_dist)
+            reward += 4.0 * closer
+            self._log(closer, lambda i: {
+                "event": "shaping_after_rock2_destroyed",
+                "target": "coin",
+                "distance": int(d_coin[i]),
+                "step": int(self.steps[i])
+            })
+            self.last_coin_dist[after_rock2] = d_coin[after_rock2]
+
+        # 3) Pickup: every key/explosive and coin under the player leaves the map
+        picking = actions == 4
+        if picking.any():
+            under = self._near(0) & self.alive & picking[:, None]
+            items = under & (self.is_key | self.is_explosive)
+            coins = under & self.is_coin
+            self.alive &= ~(items | coins)
+            first_coin = coins & (np.cumsum(coins, axis=1) == 1)  # only the first coin is kept
+            for i in np.flatnonzero(self.is_coin):
+                self._pick_up(np.flatnonzero(first_coin[:, i]), i)
+            self.coin_win |= coins.any(axis=1)
+
+            for i in np.flatnonzero(items.any(axis=0)):
+                got = items[:, i]
+                self._pick_up(np.flatnonzero(got), i)
+                self._log(got, lambda r: {
+                    "event": "collect_item",
+                    "item": self._describe(i),
+                    "position": self._topleft(r),
+                    "step": int(self.steps[r])
+                })
+                self.did_meaningful_action |= got
+                reward += 2.0 * got
+                same_kind = kind == kind[i]
+                self.known[np.ix_(got, same_kind)] = self.alive[np.ix_(got, same_kind)]
+                if kind[i] == EXPLOSIVE:
+                    # matching rock within 10 tiles
+                    close = self.alive & self.is_rock & (color == color[i]) & (dist <= 10) & got[:, None]
+                    smart = close.any(axis=1)
+                    reward += 1.0 * smart
+                    rock = close.argmax(axis=1)
+                    self._log(smart, lambda r: {
+                        "event": "smart_explosive_pickup",
+                        "item_color": str(color[i]),
+                        "type": str(self.name[rock[r]]),
+                        "matched_rock": True,
+                        "step": int(self.steps[r])
+                    })
+
+        # 4) Select item: hint bonus when a matching rock (explosive) or door is within 10 tiles
+        index = actions - 6
+        selecting = np.flatnonzero((actions >= 6) & (index < self.inventory_size))
+        if len(selecting):
+            chosen = self.inventory[selecting, index[selecting]]
+            self.selected_item[selecting] = chosen
+            self._log(selecting, lambda i: {
+                "event": "select_item",
+                "index": int(index[i]),
+                "item": self._describe(self.selected_item[i]),
+                "step": int(self.steps[i])
+            })
+            reward[selecting] += 0.3
+            goal_kind = np.where(kind[chosen] == EXPLOSIVE, ROCK, DOOR)
+            matched = ((kind == goal_kind[:, None]) & (color == color[chosen][:, None])
+                       & self.alive[selecting] & (dist[selecting] <= 10)).any(axis=1)
+            reward[selecting[matched]] += 1.0
+            self._log(selecting[matched], lambda i: {
+                "event": "hint_shaping_reward",
+                "item": self._describe(self.selected_item[i]),
+                "step": int(self.steps[i])
+            })
+
+        # 5) Step counters & exploration bonus
+        self.steps += 1
+        tile = self.pos // (self.tilewidth, self.tileheight)
+        self.episode_distance += self.has_prev_tile & (tile != self.prev_tile).any(axis=1)
+        self.prev_tile[:] = tile
+        self.has_prev_tile[:] = True
+        new_tile = ~self.visited_tiles[rows, tile[:, 1], tile[:, 0]]
+        self.visited_tiles[rows, tile[:, 1], tile[:, 0]] = True
+        reward += np.where(new_tile, 0.2, -0.05)
+
+        # 6) Adaptive reward shaping toward the next target
+        masked = lambda mask: np.where(self.alive & mask, dist, INF).min(axis=1)
+        d_exp = masked(self.is_explosive)
+        d_key = masked(self.is_key)
+        d_door = masked(self.is_blue_door)
+        has_rock1, d_rock1 = first_alive(self.is_rock & (self.name == "rock1"))
+        has_rock2, d_rock2 = first_alive(self.is_rock & (self.name == "rock2"))
+        has_coin, d_coin = first_alive(self.is_coin)
+        has_key = self._inventory_mask(self.is_key).any(axis=1)
+        has_explosive = self._inventory_mask(self.is_explosive).any(axis=1)
+
+        def shape(rows, d, last, bonus, event):
+            closer = rows & (d < last)
+            reward[:] += bonus * closer
+            if event:
+                self._log(closer, lambda i: {"event": event, "step": int(self.steps[i]), "distance": int(d[i])})
+            last[rows] = d[rows]
+
+        # Phase 1: no items held -> reachable coin once rock2 is gone, else the nearer item
+        empty = ~has_key & ~has_explosive
+        to_coin = empty & (d_coin < INF) & (d_rock2 >= INF)
+        shape(to_coin, d_coin, self.last_coin_dist, 3.0, "shaping_toward_coin")
+        seek_exp = empty & ~to_coin & (d_exp + 2 < d_key)
+        seek_key = empty & ~to_coin & ~seek_exp & (d_key + 2 < d_exp)
+        reward += 2.0 * (seek_exp & (d_exp < self.last_explosive_dist))
+        reward -= 0.05 * (seek_exp & (d_key < INF)) + 0.05 * (seek_exp & (d_door < INF))
+        reward += 2.0 * (seek_key & (d_key < self.last_key_dist))
+        reward -= 0.05 * (seek_key & (d_exp < INF)) + 0.05 * (seek_key & (d_door < INF))
+
+        # Phase 2a: explosive only -> rock2, then the coin
+        only_exp = has_explosive & ~has_key
+        shape(only_exp & has_rock2, d_rock2, self.last_rock2_dist, 3.0, "shaping_toward_rock2")
+        shape(only_exp & ~has_rock2 & (d_coin < INF), d_coin, self.last_coin_dist, 3.5, "shaping_toward_coin")
+
+        # Phase 2b: key only -> door and/or open coin, else back to an explosive
+        only_key = has_key & ~has_explosive
+        door_reachable = only_key & (d_door < INF)
+        coin_reachable = only_key & (d_coin < INF) & ~has_rock2
+        shape(door_reachable, d_door, self.last_door_dist, 2.0, "shaping_toward_door")
+        shape(coin_reachable, d_coin, self.last_coin_dist, 3.0, "shaping_toward_coin")
+        shape(only_key & ~door_reachable & ~coin_reachable, d_exp, self.last_explosive_dist, 2.5,
+              "shaping_toward_explosive")
+
+        # Phase 3: both -> rock1, then the door
+        both = has_key & has_explosive
+        shape(both & has_rock1, d_rock1, self.last_rock1_dist, 7.0, "shaping_toward_rock1")
+        shape(both & ~has_rock1 & (d_door < INF), d_door, self.last_door_dist, 4.5, "shaping_toward_door")
+
+        self.last_explosive_dist[:] = d_exp
+        self.last_key_dist[:] = d_key
+        self.last_door_dist[:] = d_door
+
+        # 7) Proximity bonus
+        near = self._near(INTERACTION_DISTANCE) & self.alive
+        near2 = self._near(INTERACTION_DISTANCE * 2) & self.alive
+        close = (near2 & (self.is_explosive | self.is_key)).any(axis=1) | (near & self.is_door).any(axis=1)
+        reward += 0.5 * close
+
+        # 8) Goal discovery bonus
+        spotted = self._near(INTERACTION_DISTANCE * 5) & self.is_blue_door & ~self.proximity_seen
+        found = spotted.any(axis=1)
+        self.proximity_seen[rows[found], spotted[found].argmax(axis=1)] = True
+        self.known[np.ix_(found, self.is_door)] = True
+        reward += 0.5 * found
+
+        # 9) Replay a memorized win: pull toward the next hard target
+        replaying = self.memorized_win & (self.hard_target_head < self.hard_target_count)
+        target = self.hard_targets[rows, np.minimum(self.hard_target_head, 4)]
+        dx = np.where(replaying, dist[rows, target], INF)
+        reachable = dx < INF
+        reward -= 0.01 * np.where(reachable, dx, 0)
+        reached = reachable & (dx < 2)
+        reward += 6.0 * reached
+        self._log(reached, lambda i: {
+            "event": "reached_hard_target",
+            "target_index": int(self.hard_target_count[i] - self.hard_target_head[i]),
+            "step": int(self.steps[i]),
+            "position": self._topleft(i)
+        })
+        self.hard_target_head += reached
+
+        # the coin only ends the game while a win is being replayed
+        coin_won = replaying & self.coin_win & ~self.game_won
+        self._log(coin_won, lambda i: {
+            "event": "game_won",
+            "reason": "treasure_collected",
+            "steps_taken": int(self.steps[i]),
+            "duration_seconds": round(time.time() - self.episode_start_time[i], 3),
+        })
+        for i in np.flatnonzero(coin_won):
+            infos[i]["game_won"] = True
+        self.coin_win &= ~coin_won
+        self.game_won |= coin_won
+
+        # 10) Win/lose
+        reward += 500.0 * self.game_won
+        done = self.game_won | (self.steps >= MAX_EPISODE_STEPS)
+        reward -= 0.01
+
+        for i in np.flatnonzero(done):
+            won = bool(self.game_won[i])
+            if won and not self.memorized_win[i]:
+                reward[i] += 10 * (MAX_EPISODE_STEPS - self.steps[i]) / MAX_EPISODE_STEPS
+                if not self.learned_object_memory[i]:
+                    snapshot = self.is_key | self.is_explosive | self.is_door
+                    self.known[i, snapshot] = self.alive[i, snapshot]
+                    self.learned_object_memory[i] = True
+                    self._log([i], lambda r: {
+                        "event": "learned_map_memory",
+                        "step": int(self.steps[r]),
+                        "key_locs": self._locs(self.known[r] & self.is_key, color),
+                        "explosive_locs": self._locs(self.known[r] & self.is_explosive, color),
+                        "door_locs": self._locs(self.known[r] & self.is_door, color),
+                        "rock_locs": self._locs(self.alive[r] & self.is_rock, self.name)
+                    })
+                self.memorized_win[i] = True
+
+            self.all_episode_logs.append({
+                "episode_summary": {
+                    "steps": int(self.steps[i]),
+                    "distance_moved": int(self.episode_distance[i]),
+                    "duration_seconds": round(time.time() - self.episode_start_time[i], 3),
+                    "game_won": won
+                },
+                "events": list(self.player_data[i])
+            })
+
+            # cancel the reward if the agent never did anything useful
+            if not self.did_meaningful_action[i]:
+                self._log([i], lambda r: {
+                    "event": "invalidated_episode",
+                    "reason": "no_pickup_or_interact",
+                    "final_reward": float(reward[r])
+                })
+                reward[i] -= 5.0
+
+        reward = np.clip(reward, -1000, 2000).astype(np.float32)
+        return reward, done, infos
+
+    def _get_obs(self):
+        cx = self.pos[:, 0] + PLAYER_SIZE // 2
+        cy = self.pos[:, 1] + PLAYER_SIZE // 2
+        slots = (self.inventory == self.selected_item[:, None]) & (self.selected_item[:, None] >= 0)
+        selected_idx = np.where(slots.any(axis=1), slots.argmax(axis=1), -1)
+        # keys, explosives and rocks still on the map, plus every door
+        is_near = (self._near(INTERACTION_DISTANCE) & self.alive & ~self.is_coin).any(axis=1)
+
+        return np.stack([
+            (cx // 50) / 30,
+            (cy // 50) / 30,
+            self._inventory_mask(self.is_key).sum(axis=1) / 5,
+            self._inventory_mask(self.is_explosive).sum(axis=1) / 5,
+            selected_idx / 4,
+            self.steps / 300,
+            is_near
+        ], axis=1).astype(np.float32)
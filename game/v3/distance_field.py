@@ -0,0 +1,212 @@
+import numpy as np
+from collections import deque
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import shortest_path
+
+UNREACHABLE = np.iinfo(np.int16).max
+
+
+class WalkabilityGrid:
+    """
+    Floor tiles plus the obstacles (rocks, closed doors) standing on them.
+
+    `version` counts the obstacles opened since the base layout, so anything
+    cached against the grid can tell whether it is stale. `restore()` puts
+    the base layout back, e.g. on env reset.
+    """
+
+    def __init__(self, floor, obstacles=()):
+        self.floor = floor
+        self.height, self.width = floor.shape
+        self.base_blocked = np.zeros_like(floor)
+        for tx, ty in obstacles:
+            if self.in_bounds(tx, ty) and floor[ty, tx]:
+                self.base_blocked[ty, tx] = True
+        self.blocked = self.base_blocked.copy()
+        self.opened = []  # tiles opened since the base layout, in order
+
+    @property
+    def version(self):
+        return len(self.opened)
+
+    @property
+    def passable(self):
+        return self.floor & ~self.blocked
+
+    def in_bounds(self, tx, ty):
+        return 0 <= tx < self.width and 0 <= ty < self.height
+
+    def is_passable(self, tx, ty):
+        return self.in_bounds(tx, ty) and self.floor[ty, tx] and not self.blocked[ty, tx]
+
+    def open(self, tile):
+        """Remove the obstacle on tile. Returns True if the topology changed."""
+        tx, ty = tile
+        if not self.in_bounds(tx, ty) or not self.blocked[ty, tx]:
+            return False
+        self.blocked[ty, tx] = False
+        self.opened.append((tx, ty))
+        return True
+
+    def restore(self):
+        self.blocked = self.base_blocked.copy()
+        self.opened = []
+
+
+class DistanceField:
+    """
+    BFS tile distances over the TMX walkable layer, with obstacles.
+
+    All pairs are precomputed once for the base layout, so every
+    reward-shaping distance is an O(1) table lookup instead of a fresh BFS.
+    When a rock is destroyed or a door opens, only the per-goal fields that
+    are actually queried get repaired, by propagating the distance decrease
+    out from the opened tile; `restore()` drops the repairs on reset.
+
+    Lookups match the per-call tile BFS the environment used to run:
+    positions are mapped to tiles with the unscaled TMX tile size, a tile is
+    floor when its layer-0 gid is non-zero, and the start tile itself does
+    not have to be walkable. Paths
+    cannot pass through obstacles, but an obstacle tile can still be the goal.
+    """
+
+    def __init__(self, tmx_data, obstacles=(), layer_index=0):
+        self.width = int(tmx_data.width)
+        self.height = int(tmx_data.height)
+        self.tile_width = int(tmx_data.tilewidth)
+        self.tile_height = int(tmx_data.tileheight)
+
+        floor = np.zeros((self.height, self.width), dtype=bool)
+        for ty in range(self.height):
+            for tx in range(self.width):
+                floor[ty, tx] = tmx_data.get_tile_gid(tx, ty, layer_index) != 0
+
+        self.grid = WalkabilityGrid(floor, [self.tile_of(pos) for pos in obstacles])
+        self.table = self._build_table()
+        self._fields = {}  # goal index -> (grid version, repaired padded field)
+
+    def _build_table(self):
+        """
+        table[goal, sy + 1, sx + 1] = path length from start tile (sx, sy) to goal.
+
+        Starts are padded by one tile on each side, because a start just outside
+        the map can still step onto a walkable border tile.
+        """
+        H, W = self.height, self.width
+        n = H * W
+        idx = np.arange(n).reshape(H, W)
+        floor = self.grid.floor
+        passable = self.grid.passable
+
+        # Directed edges out of the goal: any floor tile may expand into a
+        # passable neighbour, so blocked goals still seed their own BFS.
+        pairs = [
+            (idx[:, :-1], idx[:, 1:], floor[:, :-1] & passable[:, 1:]),
+            (idx[:, 1:], idx[:, :-1], floor[:, 1:] & passable[:, :-1]),
+            (idx[:-1, :], idx[1:, :], floor[:-1, :] & passable[1:, :]),
+            (idx[1:, :], idx[:-1, :], floor[1:, :] & passable[:-1, :]),
+        ]
+        src = np.concatenate([u[mask] for u, _, mask in pairs])
+        dst = np.concatenate([v[mask] for _, v, mask in pairs])
+        graph = coo_matrix((np.ones(len(src)), (src, dst)), shape=(n, n)).tocsr()
+
+        dist = shortest_path(graph, method="D", directed=True, unweighted=True)
+        dist = dist.reshape(n, H, W)
+        dist[~floor.reshape(n)] = np.inf        # non-floor goals are never reached
+        is_goal = np.eye(n, dtype=bool).reshape(n, H, W)
+        dist[~(passable[None] | is_goal)] = np.inf  # filled in below from the neighbours
+
+        # Non-walkable starts take one step onto their best walkable neighbour
+        padded = np.full((n, H + 4, W + 4), np.inf)
+        padded[:, 2:-2, 2:-2] = dist
+        neighbour_min = np.minimum.reduce([
+            padded[:, :-2, 1:-1],
+            padded[:, 2:, 1:-1],
+            padded[:, 1:-1, :-2],
+            padded[:, 1:-1, 2:],
+        ])
+        keep = np.zeros((n, H + 2, W + 2), dtype=bool)
+        keep[:, 1:-1, 1:-1] = passable[None] | is_goal
+        table = np.where(keep, padded[:, 1:-1, 1:-1], neighbour_min + 1)
+
+        table[~np.isfinite(table)] = UNREACHABLE
+        return table.astype(np.int16)
+
+    def tile_of(self, pos):
+        return int(pos[0] // self.tile_width), int(pos[1] // self.tile_height)
+
+    def open_obstacle(self, pos):
+        """Mark the obstacle at pos (a destroyed rock or opened door) as gone."""
+        return self.grid.open(self.tile_of(pos))
+
+    def restore(self):
+        self.grid.restore()
+        self._fields.clear()
+
+    def _field(self, goal):
+        version = self.grid.version
+        if version == 0:
+            return self.table[goal]
+
+        cached_version, field = self._fields.get(goal, (0, None))
+        if field is None:
+            field = self.table[goal].copy()
+        for tile in self.grid.opened[cached_version:version]:
+            self._repair(field, goal, tile)
+        self._fields[goal] = (version, field)
+        return field
+
+    def field(self, goal_pos):
+        """
+        Distance field to goal_pos under the current obstacles, indexed
+        [sy + 1, sx + 1] by start tile, or None if the goal is off the map.
+        The array is shared with the cache, so treat it as read-only.
+        """
+        gx, gy = self.tile_of(goal_pos)
+        if not (0 <= gx < self.width and 0 <= gy < self.height):
+            return None
+        return self._field(gy * self.width + gx)
+
+    def _repair(self, field, goal, tile):
+        """
+        Propagate the distance decrease caused by tile becoming passable.
+
+        The opened tile's stored entry value (one more than its best neighbour)
+        is already its new BFS distance, so only cells that get strictly closer
+        are revisited.
+        """
+        tx, ty = tile
+        if ty * self.width + tx == goal or field[ty + 1, tx + 1] >= UNREACHABLE:
+            return
+
+        rows, cols = field.shape
+        queue = deque([(ty + 1, tx + 1)])
+        while queue:
+            y, x = queue.popleft()
+            d = field[y, x] + 1
+            for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                if 0 <= ny < rows and 0 <= nx < cols and d < field[ny, nx]:
+                    field[ny, nx] = d
+                    if self.grid.is_passable(nx - 1, ny - 1):
+                        queue.append((ny, nx))
+
+    def path_distance(self, start_pos, goal_pos, max_steps=300):
+        """
+        Shortest walkable path length in tiles, or inf if unreachable.
+
+        Distances above max_steps count as unreachable, like the old per-call
+        BFS cutoff.
+        """
+        sx, sy = self.tile_of(start_pos)
+        gx, gy = self.tile_of(goal_pos)
+        if (sx, sy) == (gx, gy):
+            return 0
+        if not (0 <= gx < self.width and 0 <= gy < self.height):
+            return float("inf")
+        if not (-1 <= sx <= self.width and -1 <= sy <= self.height):
+            return float("inf")
+
+        d = int(self._field(gy * self.width + gx)[sy + 1, sx + 1])
+        if d >= UNREACHABLE or d > max_steps:
+            return float("inf")
+        return d
@@ -0,0 +1,112 @@
+import bz2
+import gzip
+import json
+import lzma
+import os
+import shutil
+import numpy as np
+import trajectory_store
+
+# compression picked from the file suffix, e.g. final_run.jsonl.gz
+OPENERS = {".gz": gzip.open, ".bz2": bz2.open, ".xz": lzma.open}
+
+
+def convert_numpy(obj):
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return obj
+
+
+def open_log(path, mode="rt"):
+    opener = OPENERS.get(os.path.splitext(path)[1], open)
+    return opener(path, mode, encoding="utf-8")
+
+
+class EpisodeLogWriter:
+    """
+    Append-only JSON Lines episode log, one finished episode per line.
+
+    Stands in for the all_episode_logs list: append() writes the episode and
+    flushes it straight away, so memory stays flat over any run length and
+    a crash only loses the episode in progress. Use a .gz/.bz2/.xz suffix
+    for compression; gzip is synced on every flush, while bz2/xz only
+    write whole compressed blocks, so a crash can cost the last block.
+    """
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.file = open_log(path, "at" if append else "wt")
+        self.count = 0
+
+    def append(self, episode):
+        self.file.write(json.dumps(episode, default=convert_numpy) + "\n")
+        self.file.flush()
+        self.count += 1
+
+    def extend(self, episodes):
+        for episode in episodes:
+            self.append(episode)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_episode_log(path):
+    """A .traj path gets the columnar TrajectoryWriter, anything else JSON Lines."""
+    if trajectory_store.is_store(path):
+        return trajectory_store.TrajectoryWriter(path)
+    return EpisodeLogWriter(path)
+
+
+def read_episode_logs(path):
+    """Yield episodes one at a time; a log cut short by a crash ends at its last full line."""
+    if trajectory_store.is_store(path):
+        yield from trajectory_store.episode_dicts(path)
+        return
+    with open_log(path) as f:
+        try:
+            for line in f:
+                if line.endswith("\n"):
+                    yield json.loads(line)
+        except EOFError:  # compressed stream without its trailer
+            return
+
+
+def worker_log_path(path, rank):
+    """final_run.jsonl.gz -> final_run.worker3.jsonl.gz"""
+    directory, name = os.path.split(path)
+    stem, _, suffix = name.partition(".")
+    return os.path.join(directory, f"{stem}.worker{rank}.{suffix}" if suffix else f"{stem}.worker{rank}")
+
+
+def merge_episode_logs(paths, out_path, remove=True):
+    """Concatenate per-worker logs into out_path, tagging each summary with its worker."""
+    if trajectory_store.is_store(out_path):
+        trajectory_store.merge_stores(paths, out_path)
+        if remove:
+            for path in paths:
+                shutil.rmtree(path)
+        return out_path
+    with EpisodeLogWriter(out_path) as out:
+        for rank, path in enumerate(paths):
+            for episode in read_episode_logs(path):
+                episode["episode_summary"]["worker"] = rank
+                out.append(episode)
+    if remove:
+        for path in paths:
+            os.remove(path)
+    return out_path
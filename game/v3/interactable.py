@@ -18,10 +18,12 @@ class Interactable(pygame.sprite.Sprite):
 
 # Class-level attributes for images
 class Door(Interactable):
-    open_door_image = pygame.image.load("openDoor.png").convert_alpha()
-    open_door_image = pygame.transform.smoothscale(open_door_image, (40, 40))
+    open_door_image = None  # loaded on first use, once a display exists
 
     def __init__(self, x, y, image, color, name):
+        if Door.open_door_image is None:
+            Door.open_door_image = pygame.image.load("openDoor.png").convert_alpha()
+            Door.open_door_image = pygame.transform.smoothscale(Door.open_door_image, (40, 40))
         super().__init__(x, y, image, color, name)
         self.is_open = False
 
@@ -0,0 +1,187 @@
+import multiprocessing as mp
+import random
+import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+from rl_env import ProjectGameEnv
+from episode_log import worker_log_path, merge_episode_logs, read_episode_logs
+
+
+def _worker(rank, seed, remote, parent_remote, buffers, env_kwargs):
+    """
+    Runs one ProjectGameEnv. Actions are read from and observations, rewards
+    and dones written to this worker's row of the shared buffers; the pipe
+    only carries commands and the (small) info dicts.
+    """
+    parent_remote.close()
+    random.seed(seed + rank)
+    np.random.seed(seed + rank)
+    env = ProjectGameEnv(**env_kwargs)
+    env.action_space.seed(seed + rank)
+    actions, obs, terminal_obs, rewards, dones = _views(buffers, env.observation_space.shape)
+
+    while True:
+        cmd, data = remote.recv()
+        if cmd == "step":
+            o, reward, done, info = env.step(int(actions[rank]))
+            if done:
+                terminal_obs[rank] = o
+                o = env.reset()
+            obs[rank] = o
+            rewards[rank] = reward
+            dones[rank] = done
+            remote.send(info)
+        elif cmd == "reset":
+            obs[rank] = env.reset()
+            remote.send(None)
+        elif cmd == "episode_logs":
+            remote.send(env.all_episode_logs)
+        elif cmd == "get_attr":
+            remote.send(getattr(env, data))
+        elif cmd == "set_attr":
+            remote.send(setattr(env, *data))
+        elif cmd == "env_method":
+            name, args, kwargs = data
+            remote.send(getattr(env, name)(*args, **kwargs))
+        elif cmd == "is_wrapped":
+            remote.send(isinstance(env, data))
+        elif cmd == "close":
+            env.close()
+            remote.close()
+            break
+
+
+def _views(buffers, obs_shape):
+    actions, obs, terminal_obs, rewards, dones = buffers
+    n = len(rewards)
+    return (
+        np.frombuffer(actions, dtype=np.int64),
+        np.frombuffer(obs, dtype=np.float32).reshape((n,) + obs_shape),
+        np.frombuffer(terminal_obs, dtype=np.float32).reshape((n,) + obs_shape),
+        np.frombuffer(rewards, dtype=np.float64),
+        np.frombuffer(dones, dtype=np.bool_),
+    )
+
+
+class SharedMemoryVecEnv(VecEnv):
+    """
+    ProjectGameEnv rollouts collected in num_workers processes.
+
+    Each worker owns its own env and is seeded with seed + rank. Actions,
+    observations, rewards and dones live in shared memory, so a step costs
+    one short pipe message per worker instead of pickling arrays both ways.
+    Finished episodes are reset inside the worker, like DummyVecEnv.
+
+    episode_logs() gathers every worker's all_episode_logs, in worker order.
+    With log_path, each worker streams its episodes to its own file instead
+    and close() merges them into log_path.
+    """
+
+    def __init__(self, num_workers, seed=0, start_method=None, log_path=None, **env_kwargs):
+        probe = ProjectGameEnv(**env_kwargs)
+        observation_space, action_space = probe.observation_space, probe.action_space
+        probe.close()
+        super().__init__(num_workers, observation_space, action_space)
+
+        obs_size = num_workers * int(np.prod(observation_space.shape))
+        self.buffers = (
+            mp.RawArray("b", num_workers * 8),   # int64 actions
+            mp.RawArray("f", obs_size),
+            mp.RawArray("f", obs_size),          # last obs of a finished episode
+            mp.RawArray("d", num_workers),
+            mp.RawArray("b", num_workers),       # bool dones
+        )
+        self.actions, self.obs, self.terminal_obs, self.rewards, self.dones = _views(
+            self.buffers, observation_space.shape)
+
+        self.log_path = log_path
+        self.worker_log_paths = [worker_log_path(log_path, rank) for rank in range(num_workers)] if log_path else []
+
+        ctx = mp.get_context(start_method)
+        self.remotes, self.processes = [], []
+        for rank in range(num_workers):
+            remote, work_remote = ctx.Pipe()
+            kwargs = dict(env_kwargs, log_path=self.worker_log_paths[rank]) if log_path else env_kwargs
+            process = ctx.Process(target=_worker, daemon=True,
+                                  args=(rank, seed, work_remote, remote, self.buffers, kwargs))
+            process.start()
+            work_remote.close()
+            self.remotes.append(remote)
+            self.processes.append(process)
+        self.closed = False
+
+    def step_async(self, actions):
+        self.actions[:] = np.asarray(actions).reshape(self.num_envs)
+        for remote in self.remotes:
+            remote.send(("step", None))
+
+    def step_wait(self):
+        infos = [remote.recv() for remote in self.remotes]
+        for i in np.flatnonzero(self.dones):
+            infos[i]["terminal_observation"] = self.terminal_obs[i].copy()
+        return self.obs.copy(), self.rewards.astype(np.float32), self.dones.copy(), infos
+
+    def reset(self):
+        for remote in self.remotes:
+            remote.send(("reset", None))
+        for remote in self.remotes:
+            remote.recv()
+        return self.obs.copy()
+
+    def episode_logs(self):
+        """Every worker's finished episodes, tagged with the worker that played them."""
+        if self.log_path:  # already on disk: read them back lazily
+            return (dict(episode, episode_summary=dict(episode["episode_summary"], worker=rank))
+                    for rank, path in enumerate(self.worker_log_paths) for episode in read_episode_logs(path))
+        for remote in self.remotes:
+            remote.send(("episode_logs", None))
+        logs = []
+        for rank, remote in enumerate(self.remotes):
+            for episode in remote.recv():
+                episode["episode_summary"]["worker"] = rank
+                logs.append(episode)
+        return logs
+
+    def close(self):
+        if self.closed:
+            return
+        for remote in self.remotes:
+            remote.send(("close", None))
+        for process in self.processes:
+            process.join()
+        if self.log_path:
+            merge_episode_logs(self.worker_log_paths, self.log_path)
+        self.closed = True
+
+    def seed(self, seed=None):
+        return [None] * self.num_envs  # workers are seeded at start-up
+
+    def _call(self, cmd, data, indices):
+        indices = list(self._get_indices(indices))
+        for i in indices:
+            self.remotes[i].send((cmd, data))
+        return [self.remotes[i].recv() for i in indices]
+
+    def get_attr(self, attr_name, indices=None):
+        return self._call("get_attr", attr_name, indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        self._call("set_attr", (attr_name, value), indices)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        return self._call("env_method", (method_name, method_args, method_kwargs), indices)
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return self._call("is_wrapped", wrapper_class, indices)
+
+
+def make_training_env(num_workers=1, seed=0, log_path=None):
+    """A plain ProjectGameEnv for one worker, otherwise a SharedMemoryVecEnv."""
+    if num_workers <= 1:
+        return ProjectGameEnv(log_path=log_path)
+    return SharedMemoryVecEnv(num_workers, seed=seed, log_path=log_path)
+
+
+def episode_logs(env):
+    if isinstance(env, SharedMemoryVecEnv):
+        return env.episode_logs()
+    return env.all_episode_logs
@@ -6,29 +6,8 @@ import os
 import pytmx
 import time
 
-#static layouts 
-#static layouts 
-STATIC_LAYOUT = {
-    "player": (0, 1),
-    "keys": [
-        {"pos": (8, 18), "color": "blue"},
-    ],
-    "explosives": [
-        {"pos": (14, 1), "color": "red"},
-        #{"pos": (1, 18), "color": "red"},
-    ],
-    "doors": [
-        {"pos": (15, 28), "color": "blue"},
-    ],
-    "rocks": [
-        {"pos": (15, 26), "color": "red", "name": "rock1"},
-        {"pos": (17,  5), "color": "red", "name": "rock2"}
-    ],
-
-    "coins": [
-        (18, 4),
-    ]
-}
+from sim_core import STATIC_LAYOUT, TMX_PATH  # shared with the headless env core
+
 # Initialize Pygame
 pygame.init()
 
@@ -39,7 +18,7 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.FULLSCREE
 pygame.display.set_caption("Game Title")
 
 # Load the Tiled map
-tmx_data = pytmx.load_pygame(r'C:\Users\nimam\Desktop\untitled.tmx')
+tmx_data = pytmx.load_pygame(TMX_PATH)
 # Check if the map has loaded correctly
 if tmx_data:
     print("Map loaded successfully!")
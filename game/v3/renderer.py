@@ -0,0 +1,82 @@
+import os
+import pygame
+import pytmx
+from sim_core import KEY, EXPLOSIVE, DOOR, ROCK, COIN, PLAYER_SIZE, SPRITE_SIZE, SCALING_FACTOR
+
+WHITE = (255, 255, 255)
+script_dir = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_image(path, size):
+    image = pygame.image.load(os.path.join(script_dir, path)).convert_alpha()
+    return pygame.transform.smoothscale(image, size)
+
+
+class PygameRenderer:
+    """
+    Optional pygame view of a GameCore.
+
+    Only created when the env is asked to render, so training never opens a
+    window or loads a surface. Images are loaded once and reused every frame.
+    """
+
+    def __init__(self, core, tmx_path, fps=30):
+        pygame.init()
+        self.core = core
+        self.fps = fps
+        tmx = core.tmx_data
+        self.screen = pygame.display.set_mode((tmx.width * core.tilewidth, tmx.height * core.tileheight))
+        pygame.display.set_caption("Game Title")
+        self.clock = pygame.time.Clock()
+
+        # tile images need a display, so the map is reloaded here with pygame surfaces
+        self.tmx_images = pytmx.load_pygame(tmx_path)
+        self.tiles = []
+        for layer in self.tmx_images.visible_layers:
+            if not isinstance(layer, pytmx.TiledTileLayer):
+                continue
+            for x, y, gid in layer:
+                tile = self.tmx_images.get_tile_image_by_gid(gid)
+                if tile:
+                    scaled = pygame.transform.scale(tile, (core.tilewidth, core.tileheight))
+                    self.tiles.append((scaled, (x * tmx.tilewidth * SCALING_FACTOR, y * tmx.tileheight * SCALING_FACTOR)))
+
+        size = (SPRITE_SIZE, SPRITE_SIZE)
+        self.player_image = load_image("cb.png", (PLAYER_SIZE, PLAYER_SIZE))
+        self.open_door_image = load_image("openDoor.png", (40, 40))
+        self.images = []
+        for i, kind in enumerate(core.kind):
+            color = core.color[i]
+            if kind == KEY:
+                self.images.append(load_image(f"key_{color}.png", size))
+            elif kind == EXPLOSIVE:
+                self.images.append(load_image("explosive.png", size))
+            elif kind == DOOR:
+                self.images.append(load_image(f"{color}_door.png", size))
+            elif kind == ROCK:
+                self.images.append(load_image("rock.png", size))
+            elif kind == COIN:
+                self.images.append(load_image("coin_image.png", size))
+
+    def draw(self):
+        pygame.event.pump()
+        core = self.core
+        self.screen.fill(WHITE)
+        for tile, pos in self.tiles:
+            self.screen.blit(tile, pos)
+
+        for i, kind in enumerate(core.kind):
+            if kind == DOOR:
+                image = self.open_door_image if core.door_open[i] else self.images[i]
+            elif core.alive[i]:
+                image = self.images[i]
+            else:
+                continue
+            self.screen.blit(image, tuple(int(v) for v in core.rects[i][:2]))
+
+        self.screen.blit(self.player_image, core.player_topleft)
+        pygame.display.flip()
+        self.clock.tick(self.fps)
+
+    def close(self):
+        pygame.quit()
@@ -1,51 +1,19 @@
 import gym
 from gym import spaces
 import numpy as np
-import pygame
 from collections import deque
 import time
-import projectGame3
-from item import Key, Explosive
-from coin import Coin
+import sim_core
+from sim_core import GameCore, KEY, EXPLOSIVE, DOOR, ROCK, COIN
+from distance_field import DistanceField
+from episode_log import open_episode_log
 
 INTERACTION_DISTANCE = 40
 SCALING_FACTOR = 1.2
 
-def path_distance(start_pos, goal_pos, tmx_data, max_steps=300):
-    tile_width = int(tmx_data.tilewidth)
-    tile_height = int(tmx_data.tileheight)
-
-    start_tile = (int(start_pos[0] // tile_width), int(start_pos[1] // tile_height))
-    goal_tile = (int(goal_pos[0] // tile_width), int(goal_pos[1] // tile_height))
-
-    visited = set()
-    queue = deque([(start_tile, 0)])
-
-    def is_walkable(tx, ty):
-        if tx < 0 or ty < 0 or tx >= tmx_data.width or ty >= tmx_data.height:
-            return False
-        gid = tmx_data.get_tile_gid(tx, ty, 0)
-        return gid != 0
-
-    while queue:
-        (x, y), steps = queue.popleft()
-        if (x, y) == goal_tile:
-            return steps  # shortest walkable path length
-        if steps > max_steps:
-            return float("inf")  # unreachable within limit
-
-        for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-            nx, ny = x + dx, y + dy
-            if is_walkable(nx, ny) and (nx, ny) not in visited:
-                visited.add((nx, ny))
-                queue.append(((nx, ny), steps + 1))
-
-    return float("inf")
-
-
 
 class ProjectGameEnv(gym.Env):
-    def __init__(self):
+    def __init__(self, tmx_path=sim_core.TMX_PATH, log_path=None):
         super(ProjectGameEnv, self).__init__()
         self.action_space = spaces.Discrete(10)  # 0-3 move, 4=pickup, 5=interact, 6-9=select item 0-3
         self.observation_space = spaces.Box(low=0, high=1, shape=(7,), dtype=np.float32)
@@ -56,19 +24,26 @@ class ProjectGameEnv(gym.Env):
         self.episode_start_time = None
         self.episode_distance = 0
         self.prev_tile = None
-        self.all_episode_logs = []  # stores every episode's data
+        # stores every episode's data; with log_path each one goes straight to disk
+        # instead, as JSON Lines or (for a .traj path) a columnar trajectory store
+        self.log_path = log_path
+        self.all_episode_logs = open_episode_log(log_path) if log_path else []
         self.memorized_win = False
         self.success_path = []
         self.last_success_goal_dist = None
 
 
         
-        # Initial game object setup
-        projectGame3.init_game_objects()
-        self._load_game_objects()
-        self.tmx_data   = projectGame3.tmx_data
-        self.tilewidth  = int(self.tmx_data.tilewidth  * SCALING_FACTOR)
-        self.tileheight = int(self.tmx_data.tileheight * SCALING_FACTOR)
+        # Initial game object setup: plain arrays, no pygame surfaces
+        self.tmx_data   = sim_core.load_map(tmx_path)
+        self.core       = GameCore(self.tmx_data)
+        self.tilewidth  = self.core.tilewidth
+        self.tileheight = self.core.tileheight
+        self.distances  = DistanceField(   # precomputed BFS table for shaping
+            self.tmx_data,
+            obstacles=[self.core.centers[i] for i in self.core.objects(ROCK) + self.core.objects(DOOR)]
+        )
+        self.renderer   = None  # created on the first render() call
         self.reset()
         
         self.known_key_locs = {}
@@ -87,13 +62,9 @@ class ProjectGameEnv(gym.Env):
 
 
 
-    def _load_game_objects(self):
-        self.player, self.player_data, self.items, self.doors, self.rocks, self.coins, self.all_sprites = projectGame3.get_game_objects()
-    
-
     def reset(self):
-        projectGame3.init_game_objects()
-        self._load_game_objects()
+        self.core.reset()
+        self.distances.restore()  # rocks and doors are back in place
 
         # clear all per-episode logs & timers
         self.player_data = []          
@@ -126,7 +97,8 @@ class ProjectGameEnv(gym.Env):
 
 
 
-        self.known_rock_locs = {r.name: r.rect.center for r in self.rocks}
+        core = self.core
+        self.known_rock_locs = {core.name[r]: core.centers[r] for r in core.objects(ROCK)}
         if self.memorized_win:
             self.hard_targets = deque(filter(None, [
                 self.known_explosive_locs.get("red"),
@@ -139,7 +111,7 @@ class ProjectGameEnv(gym.Env):
             self.hard_targets = deque(self.known_rock_locs.values())
 
 
-        explosives = [i for i in self.items if isinstance(i, Explosive)]
+        explosives = core.objects(EXPLOSIVE)
         print(f"[Reset #{self.steps}] Explosives on map: {len(explosives)}")
         return self._get_obs()
 
@@ -149,28 +121,27 @@ class ProjectGameEnv(gym.Env):
         done = False
         info = {}
         
+        core = self.core
         if self.steps == 0:
             self.did_meaningful_action = False
 
 
         # 1) Movement or selection or interaction
         if action in [0, 1, 2, 3]:
-            self.player.update_rl(
-                action,
-                self.tileheight,
-                self.tilewidth,
-                self.tmx_data,
-                self.player_data,
-                self.rocks
-            )
+            current_tile = core.move(action)
+            if current_tile:
+                self.player_data.append({
+                    "event": "move",
+                    "tile": current_tile,
+                    "step": self.steps
+                })
         elif action == 4:
             # PICKUP
-            collected = pygame.sprite.spritecollide(self.player, self.items, True)
-            collected_coins = pygame.sprite.spritecollide(self.player, self.coins, True)
+            collected, collected_coins = core.collect()
             
             # Handle coin pickup first (wins game)
             for coin in collected_coins:
-                self.player.pick_up(coin)
+                core.pick_up(coin)
                 done = True
                 self.coin_win = True
                 break  # break the loop and continue through the rest of `step()`
@@ -178,47 +149,47 @@ class ProjectGameEnv(gym.Env):
                             
             
             for item in collected:
-                self.player.pick_up(item)
+                core.pick_up(item)
                 self.player_data.append({
                     "event": "collect_item",
-                    "item": (item.name, item.color),
-                    "position": self.player.rect.topleft,
+                    "item": core.describe(item),
+                    "position": core.player_topleft,
                     "step": self.steps
                 })
                 
-                if isinstance(item, Key) or isinstance(item, Explosive):
+                if core.kind[item] == KEY or core.kind[item] == EXPLOSIVE:
                     self.did_meaningful_action = True
 
                 # base rewards
-                if isinstance(item, Explosive):
-                    self.known_explosive_locs = {e.color: e.rect.center for e in self.items if isinstance(e, Explosive)}
+                if core.kind[item] == EXPLOSIVE:
+                    self.known_explosive_locs = {core.color[e]: core.centers[e] for e in core.objects(EXPLOSIVE)}
                     reward += 2.0
-                    for rock in self.rocks:
-                        if rock.color == item.color:
-                            dist = path_distance(self.player.rect.center, rock.rect.center, self.tmx_data, 300)
+                    for rock in core.objects(ROCK):
+                        if core.color[rock] == core.color[item]:
+                            dist = self.distances.path_distance(core.player_center, core.centers[rock], 300)
                             if dist < float("inf") and dist <= 10:
                                 reward += 1.0
                                 self.player_data.append({
                                     "event": "smart_explosive_pickup",
-                                    "item_color": item.color,
-                                    "type": rock.name,
+                                    "item_color": core.color[item],
+                                    "type": core.name[rock],
                                     "matched_rock": True,
                                     "step": self.steps
                                 })
                                 break
-                elif isinstance(item, Key):
-                    self.known_key_locs = {k.color: k.rect.center for k in self.items if isinstance(k, Key)}
+                elif core.kind[item] == KEY:
+                    self.known_key_locs = {core.color[k]: core.centers[k] for k in core.objects(KEY)}
                     reward += 2.0
                     if self.rewarded_rock:
-                        for door in self.doors:
-                            if door.color == item.color:
-                                dist = path_distance(self.player.rect.center, door.rect.center, self.tmx_data, 300)
+                        for door in core.objects(DOOR):
+                            if core.color[door] == core.color[item]:
+                                dist = self.distances.path_distance(core.player_center, core.centers[door], 300)
                                 if dist < float("inf") and dist <= 5:
                                     reward += 0.5
                                     self.player_data.append({
                                         "event": "smart_key_pickup",
-                                        "door": getattr(door, "name", door.color),
-                                        "item_color": item.color,
+                                        "door": core.name[door],
+                                        "item_color": core.color[item],
                                         "matched_door": True,
                                         "step": self.steps
                                     })
@@ -228,17 +199,17 @@ class ProjectGameEnv(gym.Env):
             # INTERACT
             near_block = False
             # auto-select if none chosen
-            if not self.selected_item:
-                for rock in self.rocks:
-                    if self.player.rect.colliderect(rock.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
-                        for i in self.player.inventory:
-                            if isinstance(i, Explosive) and i.color == rock.color:
+            if self.selected_item is None:
+                for rock in core.objects(ROCK):
+                    if core.is_near(rock, INTERACTION_DISTANCE):
+                        for i in core.inventory:
+                            if core.kind[i] == EXPLOSIVE and core.color[i] == core.color[rock]:
                                 self.selected_item = i
                                 break
-                for door in self.doors:
-                    if self.player.rect.colliderect(door.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
-                        for i in self.player.inventory:
-                            if isinstance(i, Key) and i.color == door.color:
+                for door in core.objects(DOOR):
+                    if core.is_near(door, INTERACTION_DISTANCE):
+                        for i in core.inventory:
+                            if core.kind[i] == KEY and core.color[i] == core.color[door]:
                                 self.selected_item = i
                                 break
 
@@ -276,9 +247,9 @@ class ProjectGameEnv(gym.Env):
                 
                 # reward coin-seeking after rock2 cleared
                 if self.shaping_after_rock2:
-                    coin = next(iter(self.coins), None)
-                    if coin:
-                        d_coin = path_distance(self.player.rect.center, coin.rect.center, self.tmx_data, 300)
+                    coin = core.first(COIN)
+                    if coin is not None:
+                        d_coin = self.distances.path_distance(core.player_center, core.centers[coin], 300)
                         if self.last_coin_dist is not None and d_coin < self.last_coin_dist:
                             reward += 4.0
                             self.player_data.append({
@@ -293,10 +264,10 @@ class ProjectGameEnv(gym.Env):
             else:
                 # Failed interaction penalties
                 near_block = any(
-                    self.player.rect.colliderect(obj.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE))
-                    for obj in list(self.rocks) + list(self.doors)
+                    core.is_near(obj, INTERACTION_DISTANCE)
+                    for obj in core.objects(ROCK) + core.objects(DOOR)
                 )
-                if near_block and self.selected_item:
+                if near_block and self.selected_item is not None:
                     reward -= 1.0
                 else:
                     reward -= 0.3
@@ -304,28 +275,28 @@ class ProjectGameEnv(gym.Env):
         elif action in [6, 7, 8, 9]:
             # SELECT ITEM
             idx = action - 6
-            if idx < len(self.player.inventory):
-                self.selected_item = self.player.inventory[idx]
+            if idx < len(core.inventory):
+                self.selected_item = core.inventory[idx]
                 self.player_data.append({
                     "event": "select_item",
                     "index": idx,
-                    "item": (self.selected_item.name, self.selected_item.color),
+                    "item": core.describe(self.selected_item),
                     "step": self.steps
                 })
                 reward += 0.3
                 # hint shaping: is selected‐item usable soon?
                 matched = False
-                if isinstance(self.selected_item, Explosive):
-                    for rock in self.rocks:
-                        if rock.color == self.selected_item.color:
-                            dist = path_distance(self.player.rect.center, rock.rect.center, self.tmx_data, 300)
+                if core.kind[self.selected_item] == EXPLOSIVE:
+                    for rock in core.objects(ROCK):
+                        if core.color[rock] == core.color[self.selected_item]:
+                            dist = self.distances.path_distance(core.player_center, core.centers[rock], 300)
                             if dist < float("inf") and dist <= 10:
                                 matched = True
                                 # break
                 else:  # Key
-                    for door in self.doors:
-                        if door.color == self.selected_item.color:
-                            dist = path_distance(self.player.rect.center, door.rect.center, self.tmx_data, 300)
+                    for door in core.objects(DOOR):
+                        if core.color[door] == core.color[self.selected_item]:
+                            dist = self.distances.path_distance(core.player_center, core.centers[door], 300)
                             if dist < float("inf") and dist <= 10:
                                 matched = True
                                 break
@@ -334,15 +305,15 @@ class ProjectGameEnv(gym.Env):
                     reward += 1.0
                     self.player_data.append({
                         "event": "hint_shaping_reward",
-                        "item": (self.selected_item.name, self.selected_item.color),
+                        "item": core.describe(self.selected_item),
                         "step": self.steps
                     })
 
 
         # 2) Step‐counters & exploration bonus
         self.steps += 1
-        tx = self.player.rect.x // self.tilewidth
-        ty = self.player.rect.y // self.tileheight
+        tx = core.player_rect[0] // self.tilewidth
+        ty = core.player_rect[1] // self.tileheight
         tile = (tx, ty)
         if self.prev_tile and tile != self.prev_tile:
             self.episode_distance += 1
@@ -358,38 +329,38 @@ class ProjectGameEnv(gym.Env):
         # 3) Adaptive reward shaping: pick correct target and re-prioritize after each pickup
 
         d_exp = min(
-            (path_distance(self.player.rect.center, e.rect.center, self.tmx_data, 300)
-            for e in self.items if isinstance(e, Explosive)),
+            (self.distances.path_distance(core.player_center, core.centers[e], 300)
+            for e in core.objects(EXPLOSIVE)),
             default=float('inf')
         )
         d_key = min(
-            (path_distance(self.player.rect.center, k.rect.center, self.tmx_data, 300)
-            for k in self.items if isinstance(k, Key)),
+            (self.distances.path_distance(core.player_center, core.centers[k], 300)
+            for k in core.objects(KEY)),
             default=float('inf')
         )
         d_door = min(
-            (path_distance(self.player.rect.center, d.rect.center, self.tmx_data, 300)
-            for d in self.doors if d.color == "blue"),
+            (self.distances.path_distance(core.player_center, core.centers[d], 300)
+            for d in core.objects(DOOR) if core.color[d] == "blue"),
             default=float('inf')
         )
         # Distances to specific rocks
-        rock1 = next((r for r in self.rocks if r.name == "rock1"), None)
-        rock2 = next((r for r in self.rocks if r.name == "rock2"), None)
+        rock1 = core.first(ROCK, "rock1")
+        rock2 = core.first(ROCK, "rock2")
 
-        d_rock1 = path_distance(self.player.rect.center, rock1.rect.center, self.tmx_data, 300) if rock1 else float("inf")
+        d_rock1 = self.distances.path_distance(core.player_center, core.centers[rock1], 300) if rock1 is not None else float("inf")
         
-        d_rock2 = path_distance(self.player.rect.center, rock2.rect.center, self.tmx_data, 300) if rock2 else float("inf")
+        d_rock2 = self.distances.path_distance(core.player_center, core.centers[rock2], 300) if rock2 is not None else float("inf")
         
 
         # Distance to coin
-        coin = next(iter(self.coins), None)
-        d_coin = path_distance(self.player.rect.center, coin.rect.center, self.tmx_data, 300) if coin else float("inf")
+        coin = core.first(COIN)
+        d_coin = self.distances.path_distance(core.player_center, core.centers[coin], 300) if coin is not None else float("inf")
     
 
         
 
-        has_key = any(isinstance(i, Key) for i in self.player.inventory)
-        has_explosive = any(isinstance(i, Explosive) for i in self.player.inventory)
+        has_key = core.holds(KEY)
+        has_explosive = core.holds(EXPLOSIVE)
 
         # -------------------
         # Phase 1: No items held
@@ -427,7 +398,7 @@ class ProjectGameEnv(gym.Env):
         # Phase 2: Picked up one item
         # -------------------
         elif has_explosive and not has_key:
-            if rock2:
+            if rock2 is not None:
                 if self.last_rock2_dist is not None and d_rock2 < self.last_rock2_dist:
                     reward += 3.0
                     self.player_data.append({
@@ -448,7 +419,7 @@ class ProjectGameEnv(gym.Env):
 
         elif has_key and not has_explosive:
             door_reachable = d_door < float("inf")
-            coin_reachable = d_coin < float("inf") and not rock2  # coin is open
+            coin_reachable = d_coin < float("inf") and rock2 is None  # coin is open
 
             if door_reachable:
                 if self.last_door_dist is not None and d_door < self.last_door_dist:
@@ -486,7 +457,7 @@ class ProjectGameEnv(gym.Env):
         # -------------------
         # -------------------
         elif has_key and has_explosive:
-            if rock1:
+            if rock1 is not None:
                 if self.last_rock1_dist is not None and d_rock1 < self.last_rock1_dist:
                     reward += 7.0
                     self.player_data.append({
@@ -517,35 +488,35 @@ class ProjectGameEnv(gym.Env):
 
 
         # 4) Proximity bonuses
-        for exp in (i for i in self.items if isinstance(i, Explosive)):
-            if self.player.rect.colliderect(exp.rect.inflate(INTERACTION_DISTANCE* 2, INTERACTION_DISTANCE* 2)):
+        for exp in core.objects(EXPLOSIVE):
+            if core.is_near(exp, INTERACTION_DISTANCE* 2):
                 reward += 0.5
                 break
         else:
-            for key in (i for i in self.items if isinstance(i, Key)):
-                if self.player.rect.colliderect(key.rect.inflate(INTERACTION_DISTANCE* 2, INTERACTION_DISTANCE* 2)):
+            for key in core.objects(KEY):
+                if core.is_near(key, INTERACTION_DISTANCE* 2):
                     reward += 0.5
                     break
             else:
-                for door in self.doors:
-                    if self.player.rect.colliderect(door.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
+                for door in core.objects(DOOR):
+                    if core.is_near(door, INTERACTION_DISTANCE):
                         reward += 0.50
                         break
 
         # 5) Goal discovery bonus
-        for door in self.doors:
-            if door.color == "blue" and \
-               self.player.rect.colliderect(door.rect.inflate(INTERACTION_DISTANCE * 5, INTERACTION_DISTANCE * 5)) and \
-               id(door) not in self.proximity_seen:
+        for door in core.objects(DOOR):
+            if core.color[door] == "blue" and \
+               core.is_near(door, INTERACTION_DISTANCE * 5) and \
+               door not in self.proximity_seen:
                 reward += 0.5
-                self.proximity_seen.add(id(door))
-                self.known_door_locs = {d.color: d.rect.center for d in self.doors}
+                self.proximity_seen.add(door)
+                self.known_door_locs = {core.color[d]: core.centers[d] for d in core.objects(DOOR)}
                 break
             
     
         # 8) tiny penalty if deviating > 3 tiles from the current hard target
         if self.hard_targets and self.memorized_win:
-            dx = path_distance(self.player.rect.center, self.hard_targets[0], self.tmx_data, 300)
+            dx = self.distances.path_distance(core.player_center, self.hard_targets[0], 300)
             if dx < float('inf'):
                 reward -= 0.01 * dx
                 if dx < 2:  # if 3 tiles away
@@ -554,7 +525,8 @@ class ProjectGameEnv(gym.Env):
                         "event": "reached_hard_target",
                         "target_index": len(self.hard_targets),
                         "step": self.steps,
-                        "position": self.player.rect.topleft
+                        "position": core.player_topleft,
+                        "step": self.steps
                     })
                     self.hard_targets.popleft()
                     
@@ -592,10 +564,10 @@ class ProjectGameEnv(gym.Env):
                 efficiency_bonus = 10 * (max_steps - self.steps) / max_steps
                 reward += efficiency_bonus
                 if not self.learned_object_memory and not self.memorized_win:
-                    self.known_key_locs = {key.color: key.rect.center for key in self.items if isinstance(key, Key)}
-                    self.known_explosive_locs = {e.color: e.rect.center for e in self.items if isinstance(e, Explosive)}
-                    self.known_door_locs = {d.color: d.rect.center for d in self.doors}
-                    self.known_rock_locs = {r.name: r.rect.center for r in self.rocks}
+                    self.known_key_locs = {core.color[key]: core.centers[key] for key in core.objects(KEY)}
+                    self.known_explosive_locs = {core.color[e]: core.centers[e] for e in core.objects(EXPLOSIVE)}
+                    self.known_door_locs = {core.color[d]: core.centers[d] for d in core.objects(DOOR)}
+                    self.known_rock_locs = {core.name[r]: core.centers[r] for r in core.objects(ROCK)}
                     self.learned_object_memory = True
                     self.player_data.append({
                         "event": "learned_map_memory",
@@ -642,7 +614,7 @@ class ProjectGameEnv(gym.Env):
             #         ]    
             # if self.success_path:
             #     next_goal = self.success_path[0]
-            #     d = path_distance(self.player.rect.center, next_goal, self.tmx_data, 300)
+            #     d = self.distances.path_distance(core.player_center, next_goal, 300)
             #     if self.last_success_goal_dist is not None and d < self.last_success_goal_dist:
             #         reward += 1.0
             #     if d < 2:
@@ -662,20 +634,18 @@ class ProjectGameEnv(gym.Env):
 
 
     def _get_obs(self):
-        x, y = self.player.rect.center
+        core = self.core
+        x, y = core.player_center
         tile_x = int(x // 50)
         tile_y = int(y // 50)
-        key_count = len([i for i in self.player.inventory if isinstance(i, Key)])
-        exp_count = len([i for i in self.player.inventory if isinstance(i, Explosive)])
+        key_count = core.count_held(KEY)
+        exp_count = core.count_held(EXPLOSIVE)
         selected_idx = -1
-        if self.selected_item and self.selected_item in self.player.inventory:
-            selected_idx = self.player.inventory.index(self.selected_item)
+        if self.selected_item is not None and self.selected_item in core.inventory:
+            selected_idx = core.inventory.index(self.selected_item)
         
-        is_near = 0
-        for sprite in list(self.items) + list(self.doors) + list(self.rocks):
-            if self.player.rect.colliderect(sprite.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
-                is_near = 1
-                break
+        # keys, explosives and rocks still on the map, plus every door
+        is_near = int(np.any(core.near_mask(INTERACTION_DISTANCE) & core.alive & (core.kind != COIN)))
 
         return np.array([
             tile_x / 30,
@@ -689,27 +659,30 @@ class ProjectGameEnv(gym.Env):
 
 
     def _interact(self):
-        if not self.selected_item:
+        core = self.core
+        if self.selected_item is None:
             return False
         # else:
         #     print(f"Selected item: {self.selected_item}")
 
-        for door in self.doors:
-            if self.player.rect.colliderect(door.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
-                if isinstance(self.selected_item, Key) and self.selected_item.color == door.color:
-                    door.interact(self.player, self.selected_item)
-                    if self.selected_item in self.player.inventory:
-                        self.player.inventory.remove(self.selected_item)
+        for door in core.objects(DOOR):
+            if core.is_near(door, INTERACTION_DISTANCE):
+                if core.kind[self.selected_item] == KEY and core.color[self.selected_item] == core.color[door]:
+                    core.open_door(door, self.selected_item)
+                    self.distances.open_obstacle(core.centers[door])
+                    if self.selected_item in core.inventory:
+                        core.inventory.remove(self.selected_item)
 
                     self.player_data.append({
                         "event": "interact",
                         "type": "door",
-                        "color": door.color,
-                        "item": (self.selected_item.name, self.selected_item.color),
-                        "position": self.player.rect.topleft
+                        "color": core.color[door],
+                        "item": core.describe(self.selected_item),
+                        "position": core.player_topleft,
+                        "step": self.steps
                     })
 
-                    if door.color == "blue":
+                    if core.color[door] == "blue":
                         self.player_data.append({
                             "event": "game_won",
                             "steps_taken": self.steps,
@@ -726,31 +699,33 @@ class ProjectGameEnv(gym.Env):
                     self.player_data.append({
                         "event": "failed_interaction",
                         "reason": "wrong_item_on_door",
-                        "door_color": door.color,
-                        "item": (self.selected_item.name, self.selected_item.color),
-                        "position": self.player.rect.topleft,
+                        "door_color": core.color[door],
+                        "item": core.describe(self.selected_item),
+                        "position": core.player_topleft,
                         "step": self.steps
                     })
                     return False  # immediately exit after wrong use on valid object
                         
 
-        for rock in self.rocks:
-            if self.player.rect.colliderect(rock.rect.inflate(INTERACTION_DISTANCE, INTERACTION_DISTANCE)):
-                if isinstance(self.selected_item, Explosive) and self.selected_item.color == rock.color:
-                    rock.interact(self.player, self.selected_item)
-                    self.last_destroyed_rock_name = rock.name
-                    if rock.name == "rock2":
+        for rock in core.objects(ROCK):
+            if core.is_near(rock, INTERACTION_DISTANCE):
+                if core.kind[self.selected_item] == EXPLOSIVE and core.color[self.selected_item] == core.color[rock]:
+                    core.destroy_rock(rock, self.selected_item)
+                    self.distances.open_obstacle(core.centers[rock])
+                    self.last_destroyed_rock_name = core.name[rock]
+                    if core.name[rock] == "rock2":
                         self.shaping_after_rock2 = True
                                 
-                    if self.selected_item in self.player.inventory:
-                        self.player.inventory.remove(self.selected_item)
+                    if self.selected_item in core.inventory:
+                        core.inventory.remove(self.selected_item)
 
                     self.player_data.append({
                         "event": "interact",
-                        "type": rock.name,
-                        "color": rock.color,
-                        "item": (self.selected_item.name, self.selected_item.color),
-                        "position": self.player.rect.topleft
+                        "type": core.name[rock],
+                        "color": core.color[rock],
+                        "item": core.describe(self.selected_item),
+                        "position": core.player_topleft,
+                        "step": self.steps
                     })
 
                     self.selected_item = None
@@ -761,10 +736,10 @@ class ProjectGameEnv(gym.Env):
                     self.player_data.append({
                         "event": "failed_interaction",
                         "reason": "wrong_item_on_rock",
-                        "type": rock.name,
-                        "rock_color": rock.color,
-                        "item": (self.selected_item.name, self.selected_item.color),
-                        "position": self.player.rect.topleft,
+                        "type": core.name[rock],
+                        "rock_color": core.color[rock],
+                        "item": core.describe(self.selected_item),
+                        "position": core.player_topleft,
                         "step": self.steps
                     })
                     return False
@@ -773,8 +748,8 @@ class ProjectGameEnv(gym.Env):
         # if self.selected_item:
         #     self.player_data.append({
         #         "event": "failed_interaction",
-        #         "item": (self.selected_item.name, self.selected_item.color),
-        #         "position": self.player.rect.topleft,
+        #         "item": core.describe(self.selected_item),
+        #         "position": core.player_topleft,
         #         "step": self.steps
         #     })
 
@@ -788,32 +763,16 @@ class ProjectGameEnv(gym.Env):
         return 0.0, False
 
     def render(self, mode="human"):
-        # if mode != "human":
-        #     return
-
-        # # Clear screen
-        # projectGame2.screen.fill(projectGame2.WHITE)
-
-        # # Redraw the map
-        # for layer in projectGame2.tmx_data.visible_layers:
-        #     for x, y, gid in layer:
-        #         tile = projectGame2.tmx_data.get_tile_image_by_gid(gid)
-        #         if tile:
-        #             scaled_tile = pygame.transform.scale(tile, (
-        #                 int(projectGame2.tmx_data.tilewidth * projectGame2.SCALING_FACTOR),
-        #                 int(projectGame2.tmx_data.tileheight * projectGame2.SCALING_FACTOR)
-        #             ))
-        #             projectGame2.screen.blit(scaled_tile, (
-        #                 x * projectGame2.tmx_data.tilewidth * projectGame2.SCALING_FACTOR,
-        #                 y * projectGame2.tmx_data.tileheight * projectGame2.SCALING_FACTOR
-        #             ))
-
-        # # Draw sprites
-        # for sprite in self.all_sprites:
-        #     projectGame2.screen.blit(sprite.image, sprite.rect)
-
-        # # Update display
-        # pygame.display.flip()
-        # projectGame2.clock.tick(30)
-        pass
-
+        if mode != "human":
+            return
+        if self.renderer is None:
+            from renderer import PygameRenderer  # pygame is only needed to watch
+            self.renderer = PygameRenderer(self.core, self.tmx_data.filename)
+        self.renderer.draw()
+
+    def close(self):
+        if self.log_path:
+            self.all_episode_logs.close()
+        if self.renderer is not None:
+            self.renderer.close()
+            self.renderer = None
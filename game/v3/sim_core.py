@@ -0,0 +1,218 @@
+import math
+import numpy as np
+import pytmx
+from distance_field import WalkabilityGrid
+
+#static layouts
+STATIC_LAYOUT = {
+    "player": (0, 1),
+    "keys": [
+        {"pos": (8, 18), "color": "blue"},
+    ],
+    "explosives": [
+        {"pos": (14, 1), "color": "red"},
+        #{"pos": (1, 18), "color": "red"},
+    ],
+    "doors": [
+        {"pos": (15, 28), "color": "blue"},
+    ],
+    "rocks": [
+        {"pos": (15, 26), "color": "red", "name": "rock1"},
+        {"pos": (17,  5), "color": "red", "name": "rock2"}
+    ],
+
+    "coins": [
+        (18, 4),
+    ]
+}
+
+TMX_PATH = r'C:\Users\nimam\Desktop\untitled.tmx'
+
+INTERACTION_DISTANCE = 40
+SCALING_FACTOR = 1.2
+PLAYER_SIZE = 50           # cb.png is scaled to 50x50
+SPRITE_SIZE = int(41.6)    # every other sprite goes through projectGame3.load_image
+
+# object kinds
+KEY, EXPLOSIVE, DOOR, ROCK, COIN = range(5)
+KIND_NAMES = ["key", "explosive", "door", "rock", "coin"]
+COLORS = ["blue", "red", "green", "purple", "gold"]
+
+
+def load_map(path=TMX_PATH):
+    """Load the TMX map without tile images, so no display is needed."""
+    return pytmx.TiledMap(path)
+
+
+def _px(v):
+    # pygame rounds float rect coordinates to the nearest pixel
+    return int(math.floor(v + 0.5))
+
+
+def inflate(rect, d):
+    x, y, w, h = rect
+    return (x - d // 2, y - d // 2, w + d, h + d)
+
+
+def colliderect(a, b):
+    return a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and a[1] < b[1] + b[3] and b[1] < a[1] + a[3]
+
+
+def center(rect):
+    return (rect[0] + rect[2] // 2, rect[1] + rect[3] // 2)
+
+
+class GameCore:
+    """
+    Display-free game state: the player, inventory and every key, explosive,
+    door, rock and coin as plain arrays.
+
+    Objects live in one table (kind, color, name, weight, rect) in the order
+    projectGame3.init_game_objects spawns them, so iteration order matches the
+    old sprite groups. Collisions reproduce pygame's Rect semantics, and
+    movement follows utils.is_walkable (gid == 0 and no standing rock).
+    """
+
+    def __init__(self, tmx_data, layout=STATIC_LAYOUT):
+        self.tmx_data = tmx_data
+        self.tilewidth = int(tmx_data.tilewidth * SCALING_FACTOR)
+        self.tileheight = int(tmx_data.tileheight * SCALING_FACTOR)
+        self.layout = layout
+
+        def spawn_pos(tile):
+            x, y = tile
+            return (_px(x * tmx_data.tilewidth * SCALING_FACTOR),
+                    _px(y * tmx_data.tileheight * SCALING_FACTOR))
+
+        entries = (
+            [(KEY, k["color"], "key", 1, k["pos"]) for k in layout["keys"]]
+            + [(EXPLOSIVE, e["color"], "explosive", 4, e["pos"]) for e in layout["explosives"]]
+            + [(DOOR, d["color"], "door", 0, d["pos"]) for d in layout["doors"]]
+            + [(ROCK, r["color"], r.get("name", "rock"), 0, r["pos"]) for r in layout["rocks"]]
+            + [(COIN, "gold", "coin", 1, pos) for pos in layout["coins"]]
+        )
+        self.kind = np.array([e[0] for e in entries], dtype=np.int8)
+        self.color = [e[1] for e in entries]
+        self.name = [e[2] for e in entries]
+        self.weight = [e[3] for e in entries]
+        self.rects = np.array([spawn_pos(e[4]) + (SPRITE_SIZE, SPRITE_SIZE) for e in entries],
+                              dtype=np.int64).reshape(-1, 4)
+        self.centers = [center(tuple(int(v) for v in r)) for r in self.rects]
+        self.player_spawn = tuple(v * t * SCALING_FACTOR for v, t in
+                                  zip(layout["player"], (tmx_data.tilewidth, tmx_data.tileheight)))
+
+        # movement grid: utils.is_walkable treats gid == 0 as walkable floor
+        free = np.zeros((tmx_data.height, tmx_data.width), dtype=bool)
+        for ty in range(tmx_data.height):
+            for tx in range(tmx_data.width):
+                free[ty, tx] = tmx_data.get_tile_gid(tx, ty, 0) == 0
+        self.rock_tiles = {i: (self.centers[i][0] // self.tilewidth, self.centers[i][1] // self.tileheight)
+                           for i in self.objects(ROCK, alive_only=False)}
+        self.walk_grid = WalkabilityGrid(free, self.rock_tiles.values())
+
+        self.reset()
+
+    def reset(self):
+        x, y = self.player_spawn
+        self.player_rect = [_px(x), _px(y), PLAYER_SIZE, PLAYER_SIZE]
+        self.last_position = (x, y)
+        self.alive = np.ones(len(self.kind), dtype=bool)  # on the map / standing / uncollected
+        self.door_open = np.zeros(len(self.kind), dtype=bool)
+        self.inventory = []  # object indices, in pickup order
+        self.current_weight = 0
+        self.max_weight = 9999
+        self.walk_grid.restore()
+
+    # --- queries -------------------------------------------------------
+
+    @property
+    def player_center(self):
+        return center(self.player_rect)
+
+    @property
+    def player_topleft(self):
+        return (self.player_rect[0], self.player_rect[1])
+
+    def objects(self, kind, alive_only=True):
+        mask = self.kind == kind
+        if alive_only:
+            mask &= self.alive
+        return [int(i) for i in np.flatnonzero(mask)]
+
+    def first(self, kind, name=None):
+        for i in self.objects(kind):
+            if name is None or self.name[i] == name:
+                return i
+        return None
+
+    def near_mask(self, distance):
+        """Objects whose rect inflated by distance touches the player."""
+        px, py, pw, ph = self.player_rect
+        r = self.rects
+        x, y = r[:, 0] - distance // 2, r[:, 1] - distance // 2
+        w, h = r[:, 2] + distance, r[:, 3] + distance
+        return (px < x + w) & (x < px + pw) & (py < y + h) & (y < py + ph)
+
+    def is_near(self, i, distance):
+        return colliderect(self.player_rect, inflate(self.rects[i], distance))
+
+    def holds(self, kind):
+        return any(self.kind[i] == kind for i in self.inventory)
+
+    def count_held(self, kind):
+        return sum(1 for i in self.inventory if self.kind[i] == kind)
+
+    def describe(self, i):
+        return (self.name[i], self.color[i])
+
+    # --- actions -------------------------------------------------------
+
+    def move(self, action):
+        """
+        Step one tile for actions 0-3 (up, down, left, right).
+
+        Returns the new tile when the player lands on a tile other than the
+        last logged one, otherwise None.
+        """
+        dx_tile, dy_tile = ((0, -1), (0, 1), (-1, 0), (1, 0))[action]
+        new_tile_x = self.player_rect[0] // self.tilewidth + dx_tile
+        new_tile_y = self.player_rect[1] // self.tileheight + dy_tile
+        if not self.walk_grid.is_passable(new_tile_x, new_tile_y):
+            return None
+
+        self.player_rect[0] = new_tile_x * self.tilewidth
+        self.player_rect[1] = new_tile_y * self.tileheight
+        current_tile = (new_tile_x, new_tile_y)
+        if current_tile != self.last_position:
+            self.last_position = current_tile
+            return current_tile
+        return None
+
+    def collect(self):
+        """Remove every key/explosive and coin under the player from the map."""
+        under = self.near_mask(0) & self.alive
+        items = [int(i) for i in np.flatnonzero(under & ((self.kind == KEY) | (self.kind == EXPLOSIVE)))]
+        coins = [int(i) for i in np.flatnonzero(under & (self.kind == COIN))]
+        self.alive[items] = False
+        self.alive[coins] = False
+        return items, coins
+
+    def pick_up(self, i):
+        name, color = self.describe(i)
+        if self.current_weight + self.weight[i] <= self.max_weight:
+            self.inventory.append(i)
+            self.current_weight += self.weight[i]
+            print(f"Picked up {color} {name}. Current weight: {self.current_weight}/{self.max_weight}")
+        else:
+            print(f"Cannot pick up {color} {name}. Exceeds weight limit!")
+
+    def open_door(self, door, item):
+        print(f"{self.color[door]} Door unlocked! with {self.color[item]} {self.name[item]}")
+        self.door_open[door] = True
+        self.inventory.remove(item)
+
+    def destroy_rock(self, rock, item):
+        print(f"{self.color[rock]} Rock {self.name[rock]} destroyed with {self.color[item]} explosive!")
+        self.inventory.remove(item)
+        self.alive[rock] = False
+        self.walk_grid.open(self.rock_tiles[rock])
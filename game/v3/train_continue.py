@@ -1,33 +1,26 @@
 from stable_baselines3 import PPO
-from rl_env import ProjectGameEnv
+from parallel_rollout import make_training_env
 import os
-import json
-import numpy as np
 
-# Load env and model
-env = ProjectGameEnv()
-script_dir = os.path.dirname(os.path.abspath(__file__))
-model_path = os.path.join(script_dir, "ppo_project_gamev5.zip")
-model = PPO.load(model_path, env=env, device="cpu")
+# rollout workers: 1 keeps the single in-process env, N > 1 steps N envs
+# in parallel processes, each seeded with SEED + worker index
+NUM_WORKERS = 1
+SEED = 0
 
+if __name__ == "__main__":  # worker processes re-import this module
+    # Load env and model; finished episodes go straight into the trajectory store
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    log_path = os.path.join(script_dir, "final_run_v1.traj")
+    env = make_training_env(NUM_WORKERS, SEED, log_path)
+    model_path = os.path.join(script_dir, "ppo_project_gamev5.zip")
+    model = PPO.load(model_path, env=env, device="cpu",
+                     custom_objects={"n_steps": 2048 // NUM_WORKERS})  # same rollout size per update
 
-# Continue learning
-model.learn(total_timesteps=200_000)
 
-# Save updated model
-model.save(os.path.join(script_dir, "ppo_project_gamev1"))
+    # Continue learning
+    model.learn(total_timesteps=200_000)
 
-# Save log
-def convert_numpy(obj):
-    if isinstance(obj, np.integer):
-        return int(obj)
-    elif isinstance(obj, np.floating):
-        return float(obj)
-    elif isinstance(obj, np.ndarray):
-        return obj.tolist()
-    return obj
-
-log_path = os.path.join(script_dir, "final_run_v1.json")
-with open(log_path, "w") as f:
-    json.dump(env.all_episode_logs, f, indent=2, default=convert_numpy)
+    # Save updated model
+    model.save(os.path.join(script_dir, "ppo_project_gamev1"))
 
+    env.close()  # flushes the log (and merges the worker logs)
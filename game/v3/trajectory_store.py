@@ -0,0 +1,328 @@
+import json
+import os
+import time
+import numpy as np
+
+# integer codes, stored in the uint8 columns below; index 0 means "not set"
+EVENTS = [
+    "", "move", "collect_item", "smart_explosive_pickup", "smart_key_pickup",
+    "select_item", "hint_shaping_reward", "interact", "failed_interaction",
+    "successful_interaction", "subtask_complete", "shaping_after_rock2_destroyed",
+    "shaping_toward_coin", "shaping_toward_rock1", "shaping_toward_rock2",
+    "shaping_toward_door", "shaping_toward_explosive", "reached_hard_target",
+    "game_won", "learned_map_memory", "invalidated_episode",
+]
+NAMES = ["", "key", "explosive", "door", "rock", "rock1", "rock2", "coin"]
+COLORS = ["", "blue", "red", "green", "purple", "gold"]
+REASONS = [
+    "", "wrong_item_on_door", "wrong_item_on_rock", "treasure_collected",
+    "no_pickup_or_interact", "rock_destroyed", "door_unlocked",
+]
+EVENT_CODE = {name: code for code, name in enumerate(EVENTS)}
+
+EVENT_DTYPE = np.dtype([
+    ("episode", np.uint32),
+    ("step", np.int32),
+    ("event", np.uint8),
+    ("tile_x", np.int16), ("tile_y", np.int16),   # move events
+    ("pos_x", np.int16), ("pos_y", np.int16),     # player position in pixels
+    ("item", np.uint8), ("item_color", np.uint8),
+    ("target", np.uint8), ("target_color", np.uint8),
+    ("reason", np.uint8),
+    ("value", np.float32),   # distance, index, target_index, duration or final_reward
+])
+EPISODE_DTYPE = np.dtype([
+    ("episode", np.uint32),
+    ("steps", np.int32),
+    ("distance_moved", np.int32),
+    ("duration_seconds", np.float32),
+    ("game_won", np.bool_),
+    ("worker", np.int16),
+])
+
+# where each event keeps its target name / target colour / number
+TARGET_KEYS = ("type", "door", "rock", "target")
+TARGET_COLOR_KEYS = ("color", "door_color", "rock_color")
+VALUE_KEYS = ("distance", "index", "target_index", "duration_seconds", "final_reward")
+
+INDEX_FILE = "index.json"
+
+
+def event_codes(names):
+    return [EVENT_CODE[name] for name in names]
+
+
+def _code(table, value):
+    return table.index(value) if value is not None else 0
+
+
+def _first(event, keys):
+    for key in keys:
+        if key in event:
+            return event[key]
+    return None
+
+
+def encode_event(event, episode, step):
+    item = event.get("item") or (None, event.get("item_color"))
+    tile = event.get("tile") or (-1, -1)
+    position = event.get("position") or (-1, -1)
+    value = _first(event, VALUE_KEYS)
+    return (
+        episode, event.get("step", event.get("steps_taken", step)), EVENT_CODE[event["event"]],
+        tile[0], tile[1], position[0], position[1],
+        _code(NAMES, item[0]), _code(COLORS, item[1]),
+        _code(NAMES, _first(event, TARGET_KEYS)), _code(COLORS, _first(event, TARGET_COLOR_KEYS)),
+        _code(REASONS, event.get("reason") or event.get("subtask")),
+        np.nan if value is None else value,
+    )
+
+
+def decode_event(row):
+    """Rebuild the player_data dict rl_env logged for one row (map-memory locations are not kept)."""
+    kind = EVENTS[row["event"]]
+    step = int(row["step"])
+    item = [NAMES[row["item"]], COLORS[row["item_color"]]]
+    target, target_color = NAMES[row["target"]], COLORS[row["target_color"]]
+    reason = REASONS[row["reason"]]
+    position = [int(row["pos_x"]), int(row["pos_y"])]
+    value = float(row["value"])
+    distance = int(value) if np.isfinite(value) and value == int(value) else value
+
+    if kind == "move":
+        return {"event": kind, "tile": [int(row["tile_x"]), int(row["tile_y"])], "step": step}
+    if kind == "collect_item":
+        return {"event": kind, "item": item, "position": position, "step": step}
+    if kind == "smart_explosive_pickup":
+        return {"event": kind, "item_color": item[1], "type": target, "matched_rock": True, "step": step}
+    if kind == "smart_key_pickup":
+        return {"event": kind, "door": target, "item_color": item[1], "matched_door": True, "step": step}
+    if kind in ("select_item", "hint_shaping_reward"):
+        event = {"event": kind, "index": distance} if kind == "select_item" else {"event": kind}
+        return dict(event, item=item, step=step)
+    if kind == "interact":
+        return {"event": kind, "type": target, "color": target_color, "item": item, "position": position, "step": step}
+    if kind == "failed_interaction":
+        if reason == "wrong_item_on_door":
+            event = {"event": kind, "reason": reason, "door_color": target_color}
+        else:
+            event = {"event": kind, "reason": reason, "type": target, "rock_color": target_color}
+        return dict(event, item=item, position=position, step=step)
+    if kind == "successful_interaction":
+        return {"event": kind, "type": target, "step": step}
+    if kind == "subtask_complete":
+        event = {"event": kind, "rock": target} if target else {"event": kind}
+        return dict(event, subtask=reason, step=step)
+    if kind == "shaping_after_rock2_destroyed":
+        return {"event": kind, "target": target, "distance": distance, "step": step}
+    if kind == "reached_hard_target":
+        return {"event": kind, "target_index": distance, "step": step, "position": position}
+    if kind == "game_won":
+        event = {"event": kind, "reason": reason} if reason else {"event": kind}
+        return dict(event, steps_taken=step, duration_seconds=round(value, 3))
+    if kind == "learned_map_memory":
+        return {"event": kind, "step": step}
+    if kind == "invalidated_episode":
+        return {"event": kind, "reason": reason, "final_reward": value}
+    return {"event": kind, "step": step, "distance": distance}  # shaping_toward_*
+
+
+class TrajectoryWriter:
+    """
+    Columnar trajectory store: a directory of NumPy structured-array chunks.
+
+    Every logged event becomes one EVENT_DTYPE row (integer event code,
+    episode id, step, tile/position, item and colour enums) and every
+    episode one EPISODE_DTYPE row. Rows are buffered and written as
+    events-*.npy / episodes-*.npy chunks once chunk_rows events,
+    flush_episodes episodes or flush_seconds have built up, so a crash
+    during training loses at most that much. index.json records, per chunk,
+    its episode range and a bitmask of the event codes it contains, so
+    readers can skip chunks without opening them.
+
+    Has the same append(episode_log) interface as the all_episode_logs list,
+    so the env writes it directly in place of JSON.
+    """
+
+    def __init__(self, path, chunk_rows=1 << 16, worker=0, flush_episodes=32, flush_seconds=10.0):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        self.flush_episodes = flush_episodes
+        self.flush_seconds = flush_seconds
+        self._flushed_at = time.monotonic()
+        self.worker = worker
+        os.makedirs(path, exist_ok=True)
+        self.chunks = []
+        self.count = 0
+        self._events, self._episodes = [], []
+        self._write_index()
+
+    def append(self, episode_log):
+        episode = self.count
+        self.count += 1
+        summary = episode_log["episode_summary"]
+        self._episodes.append((episode, summary["steps"], summary["distance_moved"],
+                               summary["duration_seconds"], summary["game_won"],
+                               summary.get("worker", self.worker)))
+        step = 0
+        for event in episode_log["events"]:
+            row = encode_event(event, episode, step)
+            step = row[1]
+            self._events.append(row)
+        if (len(self._events) >= self.chunk_rows or len(self._episodes) >= self.flush_episodes
+                or time.monotonic() - self._flushed_at >= self.flush_seconds):
+            self.flush()
+
+    def write_chunk(self, events, episodes):
+        """Write ready-made structured arrays as one chunk (used when merging stores)."""
+        name = f"{len(self.chunks):06d}"
+        np.save(os.path.join(self.path, f"events-{name}.npy"), events)
+        np.save(os.path.join(self.path, f"episodes-{name}.npy"), episodes)
+        mask = 0
+        for code in np.unique(events["event"]):
+            mask |= 1 << int(code)
+        self.chunks.append({
+            "name": name,
+            "rows": len(events),
+            "episodes": [int(episodes["episode"].min()), int(episodes["episode"].max())] if len(episodes) else [0, -1],
+            "events": mask,
+        })
+        self._write_index()
+
+    def flush(self):
+        self._flushed_at = time.monotonic()
+        if not self._episodes:
+            return
+        self.write_chunk(np.array(self._events, dtype=EVENT_DTYPE),
+                         np.array(self._episodes, dtype=EPISODE_DTYPE))
+        self._events, self._episodes = [], []
+
+    def _write_index(self):
+        tmp = os.path.join(self.path, INDEX_FILE + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"chunks": self.chunks}, f)
+        os.replace(tmp, os.path.join(self.path, INDEX_FILE))
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_store(path):
+    return os.path.isfile(os.path.join(path, INDEX_FILE)) or path.endswith(".traj")
+
+
+def _chunks(path):
+    with open(os.path.join(path, INDEX_FILE)) as f:
+        return json.load(f)["chunks"]
+
+
+def _wanted(events=None, exclude=None):
+    codes = np.arange(len(EVENTS))
+    if events is not None:
+        codes = np.array(event_codes(events))
+    if exclude is not None:
+        codes = np.setdiff1d(codes, event_codes(exclude))
+    mask = 0
+    for code in codes:
+        mask |= 1 << int(code)
+    return codes, mask
+
+
+def iter_chunks(path, events=None, exclude=None, episodes=None):
+    """
+    Yield (events, episodes) arrays per chunk, pushing the filters down:
+    chunks whose index entry cannot match are never opened, and the event
+    column is tested on the memory-mapped file before other columns are read.
+    """
+    codes, mask = _wanted(events, exclude)
+    lo, hi = episodes if episodes is not None else (0, np.inf)
+    for chunk in _chunks(path):
+        first, last = chunk["episodes"]
+        if last < lo or first > hi:
+            continue
+        ep = np.load(os.path.join(path, f"episodes-{chunk['name']}.npy"))
+        if not chunk["events"] & mask:
+            ev = np.empty(0, dtype=EVENT_DTYPE)
+        else:
+            mapped = np.load(os.path.join(path, f"events-{chunk['name']}.npy"), mmap_mode="r")
+            ev = mapped[np.isin(mapped["event"], codes)]
+        if episodes is not None:
+            ev = ev[(ev["episode"] >= lo) & (ev["episode"] <= hi)]
+            ep = ep[(ep["episode"] >= lo) & (ep["episode"] <= hi)]
+        yield ev, ep
+
+
+def read_events(path, events=None, exclude=None, episodes=None):
+    """All matching event rows as one structured array."""
+    parts = [ev for ev, _ in iter_chunks(path, events, exclude, episodes)]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=EVENT_DTYPE)
+
+
+def read_episodes(path):
+    parts = [np.load(os.path.join(path, f"episodes-{chunk['name']}.npy")) for chunk in _chunks(path)]
+    return np.concatenate(parts) if parts else np.empty(0, dtype=EPISODE_DTYPE)
+
+
+def episode_dicts(path, events=None, exclude=None, won=None):
+    """
+    Yield episodes in the episode_log format ({"episode_summary", "events"}),
+    one chunk in memory at a time. won=True/False keeps only won/lost episodes.
+    """
+    for ev, ep in iter_chunks(path, events, exclude):
+        if won is not None:
+            ep = ep[ep["game_won"] == won]
+        bounds = np.searchsorted(ev["episode"], np.stack([ep["episode"], ep["episode"] + 1]))
+        for summary, start, stop in zip(ep, bounds[0], bounds[1]):
+            yield {
+                "episode_summary": {
+                    "steps": int(summary["steps"]),
+                    "distance_moved": int(summary["distance_moved"]),
+                    "duration_seconds": round(float(summary["duration_seconds"]), 3),
+                    "game_won": bool(summary["game_won"]),
+                    "worker": int(summary["worker"]),
+                },
+                "events": [decode_event(row) for row in ev[start:stop]],
+            }
+
+
+def merge_stores(paths, out_path):
+    """
+    Concatenate per-worker stores, renumbering episodes and tagging the
+    worker. The workers' small crash-safety chunks are coalesced back into
+    chunks of about chunk_rows events.
+    """
+    out = TrajectoryWriter(out_path)
+    offset = 0
+    pending, rows = [], 0
+
+    def write_pending():
+        out.write_chunk(np.concatenate([ev for ev, _ in pending]), np.concatenate([ep for _, ep in pending]))
+        pending.clear()
+
+    for worker, path in enumerate(paths):
+        count = 0
+        for ev, ep in iter_chunks(path):
+            ev, ep = ev.copy(), ep.copy()
+            count = max(count, int(ep["episode"].max()) + 1) if len(ep) else count
+            ev["episode"] += offset
+            ep["episode"] += offset
+            ep["worker"] = worker
+            pending.append((ev, ep))
+            rows += len(ev)
+            if rows >= out.chunk_rows:
+                write_pending()
+                rows = 0
+        offset += count
+    if pending:
+        write_pending()
+    out.count = offset
+    return out_path
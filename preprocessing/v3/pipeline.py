@@ -0,0 +1,337 @@
+"""
+Streaming preprocessing: raw episode log -> sequence_of_sets_formatted.csv.
+
+The notebooks (removeTheMove, removeTheSelectItem, filterFailedINteractions,
+seqOfSets, corruptData) each load a whole JSON file and write a new one.
+Here every step is a generator over episodes, so a run reads the log once
+and only ever holds one episode (plus the short e-code sequences of lost
+games, which won_first() has to hold back, and the rows corrupt() needs
+to reproduce the notebook's sampling):
+
+    episodes = read_episodes("final_run.traj", exclude=MOVE | SELECT)
+    rows = label(dedupe_failed_interactions(episodes), stats)
+    write_sequences(number(won_first(rows)), "sequence_of_sets_formatted.csv")
+
+run() wires up that default chain.
+"""
+import csv
+import json
+import os
+import random
+import sys
+import numpy as np
+
+GAME_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "game", "v3")
+
+MOVE = frozenset({"move"})
+SELECT = frozenset({"select_item"})
+
+# Presets from corruptData.ipynb
+PRESETS = {
+    "light":  {"p_delete_each":0.05,"p_replace_each":0.05,"swap_lambda":0.5,"add_lambda_known":0.3,"add_lambda_noise":0.1,"ensure_nonempty":True,"as_set_then_sorted":False},
+    "medium": {"p_delete_each":0.15,"p_replace_each":0.15,"swap_lambda":1.5,"add_lambda_known":0.8,"add_lambda_noise":0.5,"ensure_nonempty":True,"as_set_then_sorted":False},
+    "heavy":  {"p_delete_each":0.30,"p_replace_each":0.30,"swap_lambda":3.0,"add_lambda_known":1.5,"add_lambda_noise":1.2,"ensure_nonempty":True,"as_set_then_sorted":False},
+}
+
+
+# --- sources ---------------------------------------------------------
+
+def read_episodes(path, exclude=frozenset()):
+    """
+    Yield episodes from a .traj trajectory store, a JSON Lines log (.jsonl,
+    optionally .gz/.bz2/.xz) or a legacy JSON list, without the excluded
+    event types. The store drops them before loading; the legacy JSON list
+    has to be parsed whole.
+    """
+    if path.endswith(".traj") or os.path.isdir(path):
+        if GAME_DIR not in sys.path:
+            sys.path.append(GAME_DIR)
+        from trajectory_store import episode_dicts
+        yield from episode_dicts(path, exclude=exclude or None)
+        return
+
+    if path.endswith(".json"):
+        with open(path) as f:
+            episodes = json.load(f)
+    else:
+        if GAME_DIR not in sys.path:
+            sys.path.append(GAME_DIR)
+        from episode_log import read_episode_logs
+        episodes = read_episode_logs(path)
+    yield from drop_events(episodes, exclude)
+
+
+# --- episode stages --------------------------------------------------
+
+def drop_events(episodes, names):
+    for episode in episodes:
+        if names:
+            episode["events"] = [e for e in episode.get("events", []) if e.get("event") not in names]
+        yield episode
+
+
+def drop_moves(episodes):
+    return drop_events(episodes, MOVE)
+
+
+def drop_selects(episodes):
+    return drop_events(episodes, SELECT)
+
+
+def remove_redundant_failed_interactions(events):
+    filtered = []
+    last_event = None
+    for event in events:
+        if event.get("event") == "failed_interaction":
+            if last_event and last_event.get("event") == "failed_interaction":
+                # Check if redundant (same item, target, reason)
+                if (
+                    event.get("reason") == last_event.get("reason") and
+                    event.get("item") == last_event.get("item")
+                ):
+                    continue  # Skip this redundant failed_interaction
+        filtered.append(event)
+        last_event = event
+    return filtered
+
+
+def dedupe_failed_interactions(episodes):
+    for episode in episodes:
+        episode["events"] = remove_redundant_failed_interactions(episode.get("events", []))
+        yield episode
+
+
+def label_event_sequence_clean(events):
+    """The seqOfSets.ipynb e-code labelling. Returns (sequence, outcome)."""
+    sequence = []
+    key_collected = False
+    explosive_collected = False
+
+    for event in events:
+        evt = event.get("event")
+
+        if evt == "collect_item":
+            item_type = event["item"][0]
+            if item_type == "key":
+                key_collected = True
+                sequence.append("e1")
+            elif item_type == "explosive":
+                explosive_collected = True
+                sequence.append("e2")
+
+        elif evt == "failed_interaction":
+            if event.get("item", [None])[0] == "key":
+                sequence.append("e8")
+            elif event.get("item", [None])[0] == "explosive":
+                sequence.append("e7")
+
+        elif evt == "interact":
+            typ = event.get("type")
+            what = event.get("item", [None])[0]
+
+            if typ in ("rock1", "rock2"):
+                if what == "explosive":
+                    sequence.append("e5")
+                elif what == "key":
+                    sequence.append("e8")
+
+            elif typ == "door":
+                if what == "key":
+                    sequence.append("e6")
+                elif what == "explosive":
+                    sequence.append("e7")
+
+    if not key_collected:
+        sequence.append("e3")
+    if not explosive_collected:
+        sequence.append("e4")
+
+    # Determine outcome
+    outcome_event = next((e for e in reversed(events) if e.get("event") == "game_won"), None)
+    if outcome_event:
+        if outcome_event.get("reason") == "treasure_collected":
+            sequence.append("e11")  # player collects treasure (implicit via win reason)
+            sequence.append("e12")  # player wins by collecting treasure
+            return sequence, "treasure_win"
+        sequence.append("e9")   # won by door (or any non-treasure reason)
+        return sequence, "door_win"
+    sequence.append("e10")      # game not won
+    return sequence, "not_won"
+
+
+def label(episodes, stats=None):
+    """Episodes -> {"won", "sequence"} rows; stats (a dict) counts the outcomes."""
+    for episode in episodes:
+        sequence, outcome = label_event_sequence_clean(episode.get("events", []))
+        if stats is not None:
+            stats[outcome] = stats.get(outcome, 0) + 1
+        yield {"won": episode["episode_summary"].get("game_won", False), "sequence": sequence}
+
+
+# --- row stages ------------------------------------------------------
+
+def won_first(rows):
+    """Won games first, like removeTheSelectItem's sort; only lost rows are held back."""
+    lost = []
+    for row in rows:
+        if row["won"]:
+            yield row
+        else:
+            lost.append(row)
+    yield from lost
+
+
+def won_only(rows):
+    return (row for row in rows if row["won"])
+
+
+def number(rows):
+    for i, row in enumerate(rows):
+        row["episode_id"] = f"ep_{i}"
+        yield row
+
+
+def ei_index(ei):
+    try:
+        return int(''.join(ch for ch in ei if ch.isdigit()))
+    except Exception:
+        return -1
+
+
+class RNGWrapper(random.Random):
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self._np_rng = np.random.default_rng(seed)
+
+    def poisson(self, lam):
+        return int(self._np_rng.poisson(lam))
+
+
+def random_swap(seq, rng, num_swaps=1):
+    seq = seq.copy()
+    if len(seq) < 2: return seq
+    for _ in range(num_swaps):
+        i, j = rng.randrange(len(seq)), rng.randrange(len(seq))
+        if i != j:
+            seq[i], seq[j] = seq[j], seq[i]
+    return seq
+
+
+def random_deletions(seq, rng, p_delete_each=0.1):
+    return [x for x in seq if rng.random() > p_delete_each]
+
+
+def random_replacements(seq, rng, p_replace_each=0.1, universe=None):
+    if not universe: return seq
+    out = []
+    for x in seq:
+        if rng.random() < p_replace_each:
+            candidates = [u for u in universe if u != x]
+            out.append(rng.choice(candidates) if candidates else x)
+        else:
+            out.append(x)
+    return out
+
+
+def random_insertions(seq, rng, k_inserts=1, insert_pool=None):
+    if not insert_pool: return seq
+    seq = seq.copy()
+    for _ in range(k_inserts):
+        ins = rng.choice(insert_pool)
+        pos = rng.randrange(len(seq)+1)
+        seq.insert(pos, ins)
+    return seq
+
+
+def corrupt_sequence(seq, rng, params, known_universe, noise_pool):
+    out = random_deletions(seq, rng, params["p_delete_each"])
+    out = random_replacements(out, rng, params["p_replace_each"], known_universe)
+    out = random_swap(out, rng, rng.poisson(params["swap_lambda"]))
+    out = random_insertions(out, rng, rng.poisson(params["add_lambda_known"]), known_universe)
+    out = random_insertions(out, rng, rng.poisson(params["add_lambda_noise"]), noise_pool)
+    if params.get("as_set_then_sorted", False):
+        out = sorted(set(out), key=lambda x: (ei_index(x), x))
+    if params.get("ensure_nonempty", True) and not out:
+        out = [rng.choice(seq) if seq else rng.choice(known_universe)]
+    return out
+
+
+def corrupt(rows, level="medium", rate=0.1, seed=42, universe=None):
+    """
+    The corruptData.ipynb step, seed-for-seed: the rows are buffered so
+    that, like the notebook, round(rate * n) rows are picked with
+    df.sample's generator and the known universe is the alphabet found in
+    the data, sorted as strings. The noise pool is the ten codes after it.
+    """
+    rows = list(rows)
+    universe = sorted(universe or {e for row in rows for e in row["sequence"]})
+    max_idx = max([ei_index(e) for e in universe if ei_index(e) >= 0] + [0])
+    noise_pool = [f"e{i}" for i in range(max_idx+1, max_idx+11)]
+    # df.sample(n=k, random_state=seed) on a RangeIndex
+    n_to_corrupt = int(round(rate * len(rows)))
+    to_corrupt = set(np.random.RandomState(seed).choice(len(rows), size=n_to_corrupt, replace=False).tolist())
+    rng = RNGWrapper(seed=seed)
+    params = PRESETS[level]
+    for i, row in enumerate(rows):
+        original = row["sequence"]
+        is_corrupted = i in to_corrupt
+        corrupted = corrupt_sequence(original, rng, params, universe, noise_pool) if is_corrupted else original[:]
+        row["original_sequence"] = json.dumps(original)
+        row["corrupted_sequence"] = json.dumps(corrupted)
+        row["is_corrupted"] = is_corrupted
+        row["corruption_level"] = level if is_corrupted else "none"
+        yield row
+
+
+# --- sinks -----------------------------------------------------------
+
+def write_csv(rows, path, columns):
+    """Stream rows to CSV; returns the number written."""
+    n = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(columns)
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+            n += 1
+    return n
+
+
+def write_sequences(rows, path):
+    """sequence_of_sets_formatted.csv: episode_id plus the e-code list as Python literal text."""
+    return write_csv(({"episode_id": r["episode_id"], "sequence": str(r["sequence"])} for r in rows),
+                     path, ["episode_id", "sequence"])
+
+
+def write_corrupted(rows, path):
+    return write_csv(rows, path, ["episode_id", "original_sequence", "corrupted_sequence",
+                                  "is_corrupted", "corruption_level"])
+
+
+def run(log_path, out_path="sequence_of_sets_formatted.csv", won=False, corruption=None):
+    """
+    Raw log -> e-code CSV in one pass. won=True keeps only won games
+    (sequence_of_sets_formatted_Won.csv); corruption=(level, rate, seed)
+    writes the corrupted_<level>_<pct>pct.csv layout instead.
+    """
+    stats = {}
+    episodes = dedupe_failed_interactions(read_episodes(log_path, exclude=MOVE | SELECT))
+    rows = label(episodes, stats)
+    rows = number(won_only(rows) if won else won_first(rows))
+    if corruption:
+        level, rate, seed = corruption
+        stats["rows"] = write_corrupted(corrupt(rows, level, rate, seed), out_path)
+    else:
+        stats["rows"] = write_sequences(rows, out_path)
+    return stats
+
+
+if __name__ == "__main__":
+    log_path = sys.argv[1] if len(sys.argv) > 1 else "final_run.traj"
+    stats = run(log_path)
+    print("Summary:")
+    print(f"  Total episodes               : {stats['rows']}")
+    print(f"  Won by treasure (e11+e12)    : {stats.get('treasure_win', 0)}")
+    print(f"  Won by blue door (e9)        : {stats.get('door_win', 0)}")
+    print(f"  Not won (e10)                : {stats.get('not_won', 0)}")
+    print("Done! Saved to 'sequence_of_sets_formatted.csv'")